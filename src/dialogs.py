@@ -3,8 +3,9 @@ Classes handling the setup of dialogs (windows which handle user input).
 Initialize selections with correct data and connect slots (if it's the case).
 """
 
-from PyQt6.QtWidgets import QDialog, QListWidgetItem, QWidget, QDialogButtonBox
-from PyQt6.QtCore import pyqtSignal, pyqtSlot
+from PyQt6.QtWidgets import QDialog, QWidget, QDialogButtonBox, QHeaderView, QListWidgetItem
+from PyQt6.QtCore import Qt, pyqtSignal, pyqtSlot
+from flow_model import FlowTableModel
 from ui.ui_flow_details_dialog import Ui_Dialog as FlowDetailsWidget
 from ui.ui_add_host_dialog import Ui_Dialog as AddHostDialogUi
 from ui.ui_add_switch_dialog import Ui_Dialog as AddSwitchDialogUi
@@ -19,24 +20,21 @@ class AddHostDialog(QDialog):
         self.ui = AddHostDialogUi()
         self.ui.setupUi(self)
         self.ui.auto_name.stateChanged.connect(self.update_host_name_field)
-        self.mac = 0
+        self.host_name = ''
 
 
-    def init_selections(self, switches, ids):
-        for switch in switches:
-            self.ui.switch_box.addItem(switch['name'])
-        
-        self.mac = ids['mac']
-        if self.mac < 10:
-            self.mac = f"0{ids['mac']}" 
-            
-        self.ui.mac_name.setText(f"00:00:00:00:00:{self.mac}")
+    def init_selections(self, topology, id_allocator):
+        for switch in topology.switches.values():
+            self.ui.switch_box.addItem(switch.name)
+
+        self.host_name = id_allocator.next_host_name()
+        self.ui.mac_name.setText(id_allocator.next_mac())
         self.update_host_name_field()
 
     def update_host_name_field(self):
         if self.ui.auto_name.isChecked():
             self.ui.host_name.setEnabled(False)
-            self.ui.host_name.setText(f"h{self.mac}")
+            self.ui.host_name.setText(self.host_name)
         else:
             self.ui.host_name.setEnabled(True)
             self.ui.host_name.clear()
@@ -46,39 +44,42 @@ class RemoveHostDialog(QDialog):
         super().__init__(parent)
         self.ui = RemoveHostDialogUi()
         self.ui.setupUi(self)
-        self.host_and_mac_dict = {}
+        self.topology = None
     
-    def init_hosts_and_macs(self, hosts):
-        for host in hosts:
-            self.ui.host_box.addItem(host['name'])
-            self.host_and_mac_dict[host['name']] = host['mac']
+    def init_hosts_and_macs(self, topology):
+        self.topology = topology
+        for host in topology.hosts.values():
+            self.ui.host_box.addItem(host.name)
         self.ui.host_box.currentTextChanged.connect(self.update_mac)
         self.update_mac()
 
     def update_mac(self):
-        selected_host = self.ui.host_box.currentText()
-        self.ui.mac_name.setText(self.host_and_mac_dict[selected_host])
+        selected_host = self.topology.host_by_name(self.ui.host_box.currentText())
+        if selected_host is not None:
+            self.ui.mac_name.setText(selected_host.mac)
 
 class AddSwitchDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.ui = AddSwitchDialogUi()
         self.ui.setupUi(self)
-        self.dpid = 0
+        self.switch_name = ''
 
-    def init_selections(self, switches, ids):
-        for switch in switches:
-            self.ui.switch_list.addItem(QListWidgetItem(switch['name']))
-        
-        self.dpid = ids['dpid']
-        self.ui.dpid_name.setText(str(self.dpid))
+    def init_selections(self, topology, id_allocator):
+        for switch in topology.switches.values():
+            self.ui.switch_list.addItem(QListWidgetItem(switch.name))
+
+        # Mininet reads DPID strings as hex
+        dpid = id_allocator.next_dpid()
+        self.switch_name = id_allocator.next_switch_name(dpid)
+        self.ui.dpid_name.setText(f"{dpid:x}")
         self.update_switch_name_field()
         self.ui.auto_name.stateChanged.connect(self.update_switch_name_field)
 
     def update_switch_name_field(self):
         if self.ui.auto_name.isChecked():
             self.ui.switch_name.setEnabled(False)
-            self.ui.switch_name.setText(f"s{self.dpid}")
+            self.ui.switch_name.setText(self.switch_name)
         else:
             self.ui.switch_name.setEnabled(True)
             self.ui.switch_name.clear()
@@ -88,22 +89,23 @@ class RemoveSwitchDialog(QDialog):
         super().__init__(parent)
         self.ui = RemoveSwitchDialogUi()
         self.ui.setupUi(self)
-        self.switch_and_dpid_dict = {}
+        self.topology = None
 
-    def init_ui(self, switches):
-        for switch in switches:
-            self.ui.switch_box.addItem(switch['name'])
-            self.switch_and_dpid_dict[switch['name']] = str(int(switch['dpid']))
+    def init_ui(self, topology):
+        self.topology = topology
+        for switch in topology.switches.values():
+            self.ui.switch_box.addItem(switch.name)
 
         self.ui.switch_box.currentTextChanged.connect(self.update_dpid)
         self.update_dpid()
 
     def update_dpid(self):
-        selected = self.ui.switch_box.currentText()
-        self.ui.dpid_name.setText(self.switch_and_dpid_dict[selected])
+        selected = self.topology.switch_by_name(self.ui.switch_box.currentText())
+        if selected is not None:
+            self.ui.dpid_name.setText(f"{int(selected.dpid, 16):x}")
 
 class ManageFlowsDialog(QDialog):
-    get_flow_signal = pyqtSignal(str, object)
+    get_flow_signal = pyqtSignal(str)
     delete_flow_signal = pyqtSignal(dict)
     add_flow_signal = pyqtSignal(dict)
 
@@ -115,32 +117,57 @@ class ManageFlowsDialog(QDialog):
         self.detail_widget = FlowDetails(self)
         self.add_flow_dialog = AddFlow(self)
         self.hosts = {}
+        self.flow_model = FlowTableModel(self)
+        self.shown_dpid = None
+        self.flow_cache = None
+        self.ui.flow_table.setModel(self.flow_model)
+        # Fixed row heights, the view never has to measure rows off screen
+        self.ui.flow_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.ui.flow_table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
         
 
     def get_flows(self, name):
-        self.get_flow_signal.emit(self.switch_and_dpid_dict[name], self)
-
-    def init_ui(self, switches):
-        for switch in switches:
-            self.ui.switch_box.addItem(switch['name'])
-            self.switch_and_dpid_dict[switch['name']] = str(int(switch['dpid']))
+        dpid = self.switch_and_dpid_dict[name]
+        # Show what the poller last saw right away, the request below brings it up to date
+        cached = self.flow_cache.flows(dpid) if self.flow_cache is not None else None
+        if cached is not None:
+            self.update_flow_box(dpid, cached)
+        self.get_flow_signal.emit(dpid)
+
+    def current_dpid(self):
+        return self.switch_and_dpid_dict.get(self.ui.switch_box.currentText())
+
+    @pyqtSlot(str)
+    def flow_modified(self, dpid):
+        if dpid == self.current_dpid():
+            self.get_flow_signal.emit(dpid)
+
+    def init_ui(self, topology):
+        for switch in topology.switches.values():
+            self.ui.switch_box.addItem(switch.name)
+            # ofctl_rest addresses switches by their decimal DPID
+            self.switch_and_dpid_dict[switch.name] = str(int(switch.dpid, 16))
         
         self.ui.switch_box.currentTextChanged.connect(self.get_flows)
-        self.ui.flow_list.itemDoubleClicked.connect(self.display_flow_details)
+        self.ui.flow_table.doubleClicked.connect(self.display_flow_details)
+        self.ui.filter_box.textChanged.connect(self.flow_model.set_filter)
         self.ui.add_flow_button.clicked.connect(self.init_add_flow)
 
-    def update_flow_box(self, flows):
-        self.ui.flow_list.clear()
-        flow_id = 1
-        for flow in flows:
-            title = 'Flow ' + str(flow_id) + ' -> ' + flow['actions'][0]
-            flow_id += 1
-            item = QListWidgetItem(title)
-            item.setData(1, flow)
-            self.ui.flow_list.addItem(item)
-
-    def display_flow_details(self, item):
-        flow = item.data(1)
+    @pyqtSlot(str, list)
+    def update_flow_box(self, dpid, flows):
+        # Replies for a switch which is no longer selected are stale
+        if dpid != self.current_dpid():
+            return
+
+        # A refresh of the same switch only touches the flows which changed
+        if dpid == self.shown_dpid:
+            self.flow_model.update_flows(flows)
+        else:
+            self.shown_dpid = dpid
+            self.flow_model.set_flows(flows)
+
+    def display_flow_details(self, index):
+        flow = self.flow_model.flow(index.row())
         self.detail_widget.ui.actions_box.setText(str(flow['actions']))
         self.detail_widget.ui.match_box.setText(str(flow['match']))
         self.detail_widget.ui.table_text.setText(str(flow['table_id']))
@@ -151,7 +178,6 @@ class ManageFlowsDialog(QDialog):
                 'match': flow['match']}
             
             self.delete_flow_signal.emit(req)
-            self.get_flows(self.ui.switch_box.currentText())
             print("Deleted flow.")
 
     def init_add_flow(self):
@@ -162,8 +188,8 @@ class ManageFlowsDialog(QDialog):
         ui.source_box.clear()
         
         for host in self.hosts:
-            ui.source_box.addItem(host['mac'])
-            ui.destination_box.addItem(host['mac'])
+            ui.source_box.addItem(host.mac)
+            ui.destination_box.addItem(host.mac)
 
         if self.add_flow_dialog.exec():
             req = {
@@ -183,7 +209,6 @@ class ManageFlowsDialog(QDialog):
             }
             
             self.add_flow_signal.emit(req)
-            self.get_flows(self.ui.switch_box.currentText())
             print("Added flow.")
     
 class FlowDetails(QDialog):
@@ -0,0 +1,155 @@
+"""
+Qt model presenting a FlowStore as a sortable, filterable table.
+"""
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from flow_store import COUNTER_FIELDS, FlowStore
+
+# Header and FlowStore field of every column, the first one is the position of the flow in the switch reply
+COLUMNS = (
+    ('Flow', 'position'),
+    ('Table', 'table_id'),
+    ('Priority', 'priority'),
+    ('Match', 'match'),
+    ('Actions', 'actions'),
+    ('Packets', 'packet_count'),
+    ('Bytes', 'byte_count'),
+)
+
+
+class FlowTableModel(QAbstractTableModel):
+    """
+    Table of the flows of one switch. Views only ask for the rows on screen, so cells are formatted on demand
+    from the FlowStore. Sorting and filtering only reorder a list of store rows.
+    A new reply of the same switch is applied as row insertions, removals and changes,
+    so the selection and scroll position of the view survive a refresh.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = FlowStore()
+        self.rows = []
+        self.filter_text = ''
+        self.sort_column = 0
+        self.sort_order = Qt.SortOrder.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        field = COLUMNS[index.column()][1]
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if field not in ('match', 'actions'):
+                return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+            return None
+        # Match and actions may not fit their column, show them in full as tooltip
+        if role == Qt.ItemDataRole.ToolTipRole and field not in ('match', 'actions'):
+            return None
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+
+        row = self.rows[index.row()]
+        if field == 'position':
+            return self.store.value(row, field) + 1
+        if field == 'match':
+            return self.store.match_text(row)
+        if field == 'actions':
+            return self.store.actions_text(row)
+        return self.store.value(row, field)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.relayout(self.order_rows)
+
+    def set_filter(self, text):
+        self.filter_text = text
+        self.relayout(self.filter_rows)
+
+    def set_flows(self, flows):
+        """
+        Show the flows of another switch, nothing of the current table is kept.
+        """
+        self.beginResetModel()
+        self.store.load(flows)
+        self.filter_rows()
+        self.endResetModel()
+
+    def update_flows(self, flows):
+        """
+        Apply a new reply of the switch already shown, touching only the rows which changed.
+        """
+        added, removed, changed = self.store.update(flows)
+        if not (added or removed or changed):
+            return
+
+        text = self.filter_text.lower()
+        shown = {row: i for i, row in enumerate(self.rows)}
+        dropped = [shown[row] for row in removed if row in shown]
+        new = [row for row in added if self.store.contains(row, text)]
+        for row in changed:
+            # Changed actions can move a flow in or out of the filter
+            matches = self.store.contains(row, text)
+            if row in shown and not matches:
+                dropped.append(shown[row])
+            elif row not in shown and matches:
+                new.append(row)
+
+        for i in sorted(dropped, reverse=True):
+            self.beginRemoveRows(QModelIndex(), i, i)
+            del self.rows[i]
+            self.endRemoveRows()
+        if new:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+            self.rows.extend(new)
+            self.endInsertRows()
+
+        field = COLUMNS[self.sort_column][1]
+        if new or (changed and field in COUNTER_FIELDS + ('actions',)):
+            self.relayout(self.order_rows)
+
+        if self.rows and (added or removed):
+            # Positions in the reply shift for everything behind an added or removed flow
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.rows) - 1, 0))
+        if changed:
+            shown = {row: i for i, row in enumerate(self.rows)}
+            for row in changed:
+                if row in shown:
+                    self.dataChanged.emit(self.index(shown[row], 0), self.index(shown[row], len(COLUMNS) - 1))
+
+    def relayout(self, reorder):
+        """
+        Reorder the rows with reorder() and move the persistent indexes (selection, current row) along.
+        """
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        rows = [self.rows[index.row()] for index in persistent]
+        reorder()
+        shown = {row: i for i, row in enumerate(self.rows)}
+        self.changePersistentIndexList(persistent, [self.index(shown[row], index.column()) if row in shown
+            else QModelIndex() for row, index in zip(rows, persistent)])
+        self.layoutChanged.emit()
+
+    def filter_rows(self):
+        self.rows = self.store.search(self.filter_text) if self.filter_text else self.store.rows()
+        self.order_rows()
+
+    def order_rows(self):
+        # Python's sort is stable, equal keys keep their current order
+        self.rows.sort(key=self.store.sort_key(COLUMNS[self.sort_column][1]),
+            reverse=self.sort_order == Qt.SortOrder.DescendingOrder)
+
+    def flow(self, row):
+        return self.store.flow(self.rows[row])
@@ -0,0 +1,162 @@
+"""
+Background polling of the flow statistics of every switch into a shared cache.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QElapsedTimer, QObject, QTimer, pyqtSignal, pyqtSlot
+
+POLL_INTERVAL = 10000
+RATE_LIMIT = 20
+MAX_WORKERS = 4
+MAX_BACKOFF = 120000
+TICK_INTERVAL = 100
+
+
+class FlowCache():
+    """
+    Latest flows and aggregate statistics of every switch, by ofctl (decimal) dpid.
+    Written from the poller threads and read from the GUI, so every access takes the lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def put(self, dpid, flows, aggregate):
+        with self.lock:
+            self.entries[dpid] = (flows, aggregate, time.monotonic())
+
+    def flows(self, dpid):
+        with self.lock:
+            entry = self.entries.get(dpid)
+        return entry[0] if entry else None
+
+    def aggregate(self, dpid):
+        with self.lock:
+            entry = self.entries.get(dpid)
+        return entry[1] if entry else None
+
+    def age(self, dpid):
+        with self.lock:
+            entry = self.entries.get(dpid)
+        return time.monotonic() - entry[2] if entry else None
+
+    def retain(self, dpids):
+        with self.lock:
+            for dpid in self.entries.keys() - set(dpids):
+                del self.entries[dpid]
+
+
+class PollState():
+    """
+    When a switch is polled next, and how often in a row polling it failed.
+    """
+
+    def __init__(self, next_due):
+        self.next_due = next_due
+        self.failures = 0
+        self.in_flight = False
+
+
+class FlowPoller(QObject):
+    """
+    Polls stats/flow and stats/aggregateflow of every switch every interval ms, several switches at once.
+    A token bucket keeps it below rate_limit switch polls per second, and a switch that fails is retried
+    after an exponentially growing delay instead of every interval. Results go into the FlowCache first
+    and are then announced through flows_signal and aggregate_signal.
+    Scheduling runs on the GUI thread, only the requests run on the pool.
+    """
+
+    logger = logging.getLogger('FlowPoller')
+
+    flows_signal = pyqtSignal(str, list)
+    aggregate_signal = pyqtSignal(str, dict)
+    polled_signal = pyqtSignal(str, str)
+
+    def __init__(self, client, cache, interval=POLL_INTERVAL, rate_limit=RATE_LIMIT, max_workers=MAX_WORKERS,
+            parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.cache = cache
+        self.interval = interval
+        self.rate_limit = rate_limit
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='flow-poller')
+        self.switches = {}
+        self.tokens = rate_limit
+        self.last_tick = 0
+        self.clock = QElapsedTimer()
+        self.clock.start()
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+        # Results are handed back to the GUI thread, which owns the schedule
+        self.polled_signal.connect(self.polled)
+
+    def start(self):
+        self.last_tick = self.clock.elapsed()
+        self.timer.start(TICK_INTERVAL)
+
+    def stop(self):
+        self.timer.stop()
+        self.executor.shutdown(wait=False)
+
+    def set_switches(self, dpids):
+        """
+        Poll exactly these switches from now on, new ones right away.
+        """
+        now = self.clock.elapsed()
+        for dpid in self.switches.keys() - set(dpids):
+            del self.switches[dpid]
+        for dpid in dpids:
+            if dpid not in self.switches:
+                self.switches[dpid] = PollState(now)
+        self.cache.retain(self.switches)
+
+    @pyqtSlot()
+    def tick(self):
+        now = self.clock.elapsed()
+        self.tokens = min(self.rate_limit, self.tokens + (now - self.last_tick) * self.rate_limit / 1000)
+        self.last_tick = now
+
+        due = sorted((state.next_due, dpid) for dpid, state in self.switches.items()
+            if not state.in_flight and state.next_due <= now)
+        for next_due, dpid in due:
+            if self.tokens < 1:
+                break
+            self.tokens -= 1
+            self.switches[dpid].in_flight = True
+            self.executor.submit(self.poll, dpid)
+
+    def poll(self, dpid):
+        try:
+            flows = self.client.get_flows(dpid)
+            aggregate = self.client.get_aggregate_flows(dpid)
+        except Exception as error:
+            self.polled_signal.emit(dpid, str(error) or type(error).__name__)
+            return
+        self.cache.put(dpid, flows, aggregate)
+        self.polled_signal.emit(dpid, '')
+
+    @pyqtSlot(str, str)
+    def polled(self, dpid, error):
+        state = self.switches.get(dpid)
+        if state is None:
+            # Removed while it was polled
+            self.cache.retain(self.switches)
+            return
+        state.in_flight = False
+
+        if error:
+            state.failures += 1
+            backoff = min(self.interval * 2 ** state.failures, MAX_BACKOFF)
+            state.next_due = self.clock.elapsed() + backoff
+            self.logger.warning(f"Polling flows of {dpid} failed ({error}), retrying in {backoff / 1000:.1f} s")
+            return
+
+        state.failures = 0
+        state.next_due = self.clock.elapsed() + self.interval
+        self.flows_signal.emit(dpid, self.cache.flows(dpid))
+        self.aggregate_signal.emit(dpid, self.cache.aggregate(dpid))
@@ -0,0 +1,138 @@
+"""
+Compact storage of the flow statistics of a switch.
+"""
+
+import json
+from array import array
+
+NUMERIC_FIELDS = ('table_id', 'priority', 'cookie', 'packet_count', 'byte_count', 'duration_sec')
+# Fields which change while a flow is installed, a flow whose actions and counters are equal is unchanged
+COUNTER_FIELDS = ('packet_count', 'byte_count')
+
+# One encoder for every flow, json.dumps sets up a new one per call
+compact_json = json.JSONEncoder(separators=(',', ':'), sort_keys=True).encode
+
+
+class FlowStore():
+    """
+    Flows of one switch stored by column, numbers in typed arrays and match and actions as compact JSON text,
+    instead of one dict per flow. A row is only turned back into a flow dict when it is needed.
+    Flows are identified by (table_id, priority, cookie, match), a flow keeps its row as long as it is installed
+    and the rows of removed flows are reused.
+    """
+
+    def __init__(self, flows=()):
+        self.load(flows)
+
+    def clear(self):
+        self.numbers = {field: array('Q') for field in NUMERIC_FIELDS + ('position',)}
+        self.matches = []
+        self.actions = []
+        self.keys = []
+        self.index = {}
+        self.free = []
+
+    def load(self, flows):
+        self.clear()
+        self.update(flows)
+
+    def update(self, flows):
+        """
+        Bring the store in line with a new reply of the switch.
+        Returns the rows that were added, removed and changed, only those are written.
+        """
+        added = []
+        changed = []
+        seen = set()
+        for position, flow in enumerate(flows):
+            match = compact_json(flow.get('match', {}))
+            key = (int(flow.get('table_id', 0)), int(flow.get('priority', 0)), int(flow.get('cookie', 0)), match)
+            seen.add(key)
+            actions = compact_json(flow.get('actions', []))
+
+            row = self.index.get(key)
+            if row is None:
+                row = self.allocate(key, match)
+                added.append(row)
+            elif self.actions[row] != actions or any(self.numbers[field][row] != int(flow.get(field, 0))
+                    for field in COUNTER_FIELDS):
+                changed.append(row)
+            else:
+                self.numbers['position'][row] = position
+                continue
+
+            self.numbers['position'][row] = position
+            self.actions[row] = actions
+            for field in NUMERIC_FIELDS:
+                self.numbers[field][row] = int(flow.get(field, 0))
+
+        removed = [row for key, row in self.index.items() if key not in seen]
+        for row in removed:
+            self.release(row)
+        return added, removed, changed
+
+    def allocate(self, key, match):
+        if self.free:
+            row = self.free.pop()
+            self.keys[row] = key
+            self.matches[row] = match
+        else:
+            row = len(self.keys)
+            for column in self.numbers.values():
+                column.append(0)
+            self.keys.append(key)
+            self.matches.append(match)
+            self.actions.append('')
+        self.index[key] = row
+        return row
+
+    def release(self, row):
+        del self.index[self.keys[row]]
+        self.keys[row] = None
+        self.matches[row] = ''
+        self.actions[row] = ''
+        self.free.append(row)
+
+    def __len__(self):
+        return len(self.index)
+
+    def rows(self):
+        return [row for row, key in enumerate(self.keys) if key is not None]
+
+    def value(self, row, field):
+        return self.numbers[field][row]
+
+    def match(self, row):
+        return json.loads(self.matches[row])
+
+    def action_list(self, row):
+        return json.loads(self.actions[row])
+
+    def match_text(self, row):
+        return ', '.join(f"{key}={value}" for key, value in self.match(row).items())
+
+    def actions_text(self, row):
+        return ', '.join(str(action) for action in self.action_list(row))
+
+    def flow(self, row):
+        flow = {field: self.numbers[field][row] for field in NUMERIC_FIELDS}
+        flow['match'] = self.match(row)
+        flow['actions'] = self.action_list(row)
+        return flow
+
+    def contains(self, row, text):
+        """
+        Whether the match or actions of a row contain text (already lower case).
+        """
+        return text in self.matches[row].lower() or text in self.actions[row].lower()
+
+    def search(self, text):
+        text = text.lower()
+        return [row for row in self.rows() if self.contains(row, text)]
+
+    def sort_key(self, field):
+        if field == 'match':
+            return self.matches.__getitem__
+        if field == 'actions':
+            return self.actions.__getitem__
+        return self.numbers[field].__getitem__
@@ -0,0 +1,97 @@
+"""
+Headless entry point: runs Mininet, the Ryu sync and the topology model without Qt or the Mininet CLI.
+A scenario file drives the run, e.g.
+
+    {
+        "topology": "DualSwitchTopo",
+        "steps": [
+            {"action": "batch", "switches": [{"name": "s3", "dpid": "3", "link_to": ["s1"]}],
+                                "hosts": [{"name": "h4", "mac": "00:00:00:00:00:04", "switch": "s3"}]},
+            {"action": "sleep", "seconds": 1},
+            {"action": "remove_host", "name": "h4"},
+            {"action": "remove_switch", "name": "s3"}
+        ]
+    }
+
+Usage: sudo python headless.py scenario.json
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+
+import topos
+from mininet_engine import MininetEngine
+from topology import TopologyModel, records_from_snapshot
+from topology_diff import diff_snapshots, index_snapshot
+
+
+class HeadlessRunner():
+    """
+    Applies the steps of a scenario to a MininetEngine and keeps a TopologyModel in sync with Ryu after every change.
+    """
+
+    logger = logging.getLogger('Headless')
+
+    def __init__(self, scenario):
+        self.scenario = scenario
+        self.topology = TopologyModel()
+        topo = getattr(topos, scenario.get('topology', 'DualSwitchTopo'))()
+        self.engine = MininetEngine(topo=topo, on_change=self.sync)
+
+    def sync(self):
+        host_names = {host.MAC(): host.name for host in self.engine.net.hosts}
+        snapshot = self.engine.rest_client.get_full_topology()
+        switches, hosts, links = records_from_snapshot(snapshot, host_names)
+
+        diff = diff_snapshots(self.topology.index(), index_snapshot(switches, hosts, links))
+        self.topology.apply_diff(diff)
+        self.logger.info(f"Topology updated: {diff}")
+
+    def run_step(self, step):
+        action = step['action']
+        if action == 'batch':
+            self.engine.apply_batch(step)
+        elif action == 'add_host':
+            self.engine.add_host(step)
+        elif action == 'add_switch':
+            self.engine.add_switch(step)
+        elif action == 'remove_host':
+            self.engine.remove_host(step['name'])
+        elif action == 'remove_switch':
+            self.engine.remove_switch(step['name'], self.engine.net.get(step['name']).dpid)
+        elif action == 'sleep':
+            time.sleep(step['seconds'])
+        else:
+            raise ValueError(f"Unknown scenario action {action}")
+
+    def run(self):
+        self.engine.start()
+        try:
+            for step in self.scenario.get('steps', []):
+                self.logger.info(f"Running step {step['action']}")
+                self.run_step(step)
+        finally:
+            self.logger.info(f"Final topology: {len(self.topology.switches)} switches, "
+                f"{len(self.topology.hosts)} hosts, {len(self.topology.links)} links")
+            self.engine.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a MnGUI scenario without the GUI.')
+    parser.add_argument('scenario', help='JSON scenario file')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    with open(args.scenario) as scenario_file:
+        scenario = json.load(scenario_file)
+
+    HeadlessRunner(scenario).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Allocation of unique identifiers for new nodes: switch DPIDs, host MAC addresses and node names.
+"""
+
+MAC_LIMIT = 1 << 48
+DPID_LIMIT = 1 << 64
+
+
+def format_mac(value):
+    return ':'.join(f"{(value >> shift) & 0xff:02x}" for shift in range(40, -8, -8))
+
+
+def parse_mac(mac):
+    octets = mac.split(':')
+    if len(octets) != 6 or not all(1 <= len(octet) <= 2 for octet in octets):
+        raise ValueError(f"Invalid MAC address {mac}")
+    return int(''.join(octet.zfill(2) for octet in octets), 16)
+
+
+class IdPool():
+    """
+    Unique integers in [first, limit).
+    Released values go on a free list and are handed out again first, otherwise a counter moves past
+    every value already in use. Each value is skipped at most once, so allocation is amortized O(1).
+    """
+
+    def __init__(self, first, limit):
+        self.limit = limit
+        self.next = first
+        self.free = []
+        self.used = set()
+
+    def peek(self):
+        # Free list entries may have been reserved explicitly since they were released
+        while self.free and self.free[-1] in self.used:
+            self.free.pop()
+        if self.free:
+            return self.free[-1]
+
+        while self.next in self.used:
+            self.next += 1
+        if self.next >= self.limit:
+            raise ValueError('Identifier space exhausted')
+        return self.next
+
+    def allocate(self):
+        value = self.peek()
+        self.reserve(value)
+        return value
+
+    def reserve(self, value):
+        """
+        Mark a value as used, returns False if it already was.
+        """
+        if value in self.used:
+            return False
+        self.used.add(value)
+        return True
+
+    def release(self, value):
+        if value in self.used:
+            self.used.remove(value)
+            self.free.append(value)
+
+    def __contains__(self, value):
+        return value in self.used
+
+
+class IdAllocator():
+    """
+    Identifier pools for DPIDs, MACs and host numbers, plus the set of node names in use.
+    Everything seen in the topology is reserved, so suggested identifiers never collide with existing nodes.
+    """
+
+    def __init__(self):
+        self.dpids = IdPool(1, DPID_LIMIT)
+        self.macs = IdPool(1, MAC_LIMIT)
+        self.host_numbers = IdPool(1, MAC_LIMIT)
+        self.names = set()
+
+    def next_dpid(self):
+        return self.dpids.peek()
+
+    def next_mac(self):
+        return format_mac(self.macs.peek())
+
+    def next_host_name(self):
+        # Every hN name in use has its number reserved, see reserve_name
+        return f"h{self.host_numbers.peek()}"
+
+    def next_switch_name(self, dpid):
+        name = f"s{dpid}"
+        suffix = 1
+        while name in self.names:
+            name = f"s{dpid}-{suffix}"
+            suffix += 1
+        return name
+
+    def reserve_name(self, name):
+        self.names.add(name)
+        if name.startswith('h') and name[1:].isdigit():
+            self.host_numbers.reserve(int(name[1:]))
+
+    def release_name(self, name):
+        self.names.discard(name)
+        if name.startswith('h') and name[1:].isdigit():
+            self.host_numbers.release(int(name[1:]))
+
+    def host_available(self, name, mac):
+        value = parse_mac(mac)
+        return name not in self.names and 0 < value < MAC_LIMIT and value not in self.macs
+
+    def switch_available(self, name, dpid):
+        return name not in self.names and 0 < dpid < DPID_LIMIT and dpid not in self.dpids
+
+    def reserve_host(self, name, mac):
+        self.reserve_name(name)
+        self.macs.reserve(parse_mac(mac))
+
+    def release_host(self, name, mac):
+        self.release_name(name)
+        self.macs.release(parse_mac(mac))
+
+    def reserve_switch(self, name, dpid):
+        self.reserve_name(name)
+        self.dpids.reserve(dpid)
+
+    def release_switch(self, name, dpid):
+        self.release_name(name)
+        self.dpids.release(dpid)
@@ -0,0 +1,366 @@
+"""
+Node layouts for the topology canvas.
+The spring layout keeps positions across refreshes so existing nodes stay put and only new nodes have to be placed.
+The structured layouts (layered, radial, fanned) are computed from scratch with NumPy in near linear time,
+so they stay usable for data-center sized topologies with thousands of nodes.
+"""
+
+import math
+import random
+
+import numpy as np
+
+WARM_ITERATIONS = 15
+NEIGHBOR_DISTANCE = 0.15
+
+# Structured layouts work in units of the distance between two switches and are scaled to [-1, 1] afterwards
+HOST_SPACING = 0.4
+MIN_HOST_DISTANCE = 0.6
+LAYER_DISTANCE = 2.0
+LAYERED_HOST_SPREAD = 2 * math.pi / 3
+RADIAL_HOST_SPREAD = math.pi / 2
+
+
+class LayoutCache():
+    """
+    Keeps the position of every node of the graph.
+    New nodes start next to their already placed neighbors and only they (with their neighbors pinned)
+    get a few warm-started spring iterations, instead of a full spring layout from random positions.
+    """
+
+    def __init__(self, iterations=WARM_ITERATIONS, seed=None):
+        self.iterations = iterations
+        self.random = random.Random(seed)
+        self.positions = {}
+
+    def clear(self):
+        self.positions.clear()
+
+    def update(self, G):
+        import networkx as nx
+
+        for node in self.positions.keys() - set(G.nodes):
+            del self.positions[node]
+
+        new_nodes = [node for node in G.nodes if node not in self.positions]
+        if not new_nodes:
+            return self.positions
+
+        if not self.positions:
+            self.positions.update(nx.spring_layout(G, seed=self.random.randrange(1 << 30)))
+            return self.positions
+
+        self.place_near_neighbors(G, new_nodes)
+
+        if self.iterations:
+            # Relax only the new nodes, pinned to their placed neighbors
+            region = set(new_nodes)
+            for node in new_nodes:
+                region.update(G.neighbors(node))
+            pinned = [node for node in region if node not in new_nodes]
+            relaxed = nx.spring_layout(G.subgraph(region), pos={node: self.positions[node] for node in region},
+                fixed=pinned or None, iterations=self.iterations, k=1 / math.sqrt(len(G)),
+                seed=self.random.randrange(1 << 30))
+            for node in new_nodes:
+                self.positions[node] = relaxed[node]
+
+        return self.positions
+
+    def place_near_neighbors(self, G, new_nodes):
+        """
+        Put new nodes around the centre of their placed neighbors, breadth first so chains of new nodes
+        grow outwards from the existing layout. A component without any placed node is seeded inside the bounds.
+        """
+        pending = list(new_nodes)
+        while pending:
+            unplaced = []
+            for node in pending:
+                placed = [self.positions[neighbor] for neighbor in G.neighbors(node) if neighbor in self.positions]
+                if placed:
+                    x = sum(position[0] for position in placed) / len(placed)
+                    y = sum(position[1] for position in placed) / len(placed)
+                    angle = self.random.uniform(0, 2 * math.pi)
+                    self.positions[node] = (x + NEIGHBOR_DISTANCE * math.cos(angle),
+                        y + NEIGHBOR_DISTANCE * math.sin(angle))
+                else:
+                    unplaced.append(node)
+
+            if unplaced and len(unplaced) == len(pending):
+                # No progress, seed one node at random and grow the rest from it
+                xs = [position[0] for position in self.positions.values()] or [-1, 1]
+                ys = [position[1] for position in self.positions.values()] or [-1, 1]
+                node = unplaced.pop(0)
+                self.positions[node] = (self.random.uniform(min(xs), max(xs)), self.random.uniform(min(ys), max(ys)))
+            pending = unplaced
+
+
+def graph_arrays(G):
+    """
+    Index arrays of the switch graph: the switch and host node lists (switches sorted by dpid),
+    both directions of every inter-switch link as (src, dst) arrays and the switch index of every host (-1 if none).
+    """
+    switches = sorted(node for node, data in G.nodes(data=True) if data['element'] == 'Switch')
+    hosts = [node for node, data in G.nodes(data=True) if data['element'] == 'Host']
+    index = {node: i for i, node in enumerate(switches)}
+
+    links = np.array([(index[u], index[v]) for u, v in G.edges if u in index and v in index], dtype=int).reshape(-1, 2)
+    src = np.concatenate((links[:, 0], links[:, 1]))
+    dst = np.concatenate((links[:, 1], links[:, 0]))
+
+    host_switch = np.full(len(hosts), -1, dtype=int)
+    for i, host in enumerate(hosts):
+        for neighbor in G.neighbors(host):
+            if neighbor in index:
+                host_switch[i] = index[neighbor]
+                break
+    return switches, hosts, src, dst, host_switch
+
+
+def bfs_levels(src, dst, count, sources, stack=False):
+    """
+    Hop distance of every switch from the sources, one NumPy step per level.
+    Components that cannot be reached are started again from their highest degree switch,
+    at level 0 or, with stack, one level past the deepest one so far.
+    """
+    order = np.argsort(src, kind='stable')
+    neighbors = dst[order]
+    indptr = np.searchsorted(src[order], np.arange(count + 1))
+    degree = np.diff(indptr)
+
+    level = np.full(count, -1, dtype=int)
+    frontier = np.unique(np.asarray(sources, dtype=int))
+    depth = 0
+    while count:
+        if not frontier.size:
+            unreached = np.flatnonzero(level < 0)
+            if not unreached.size:
+                break
+            frontier = unreached[[np.argmax(degree[unreached])]]
+            depth = level.max() + 1 if stack else 0
+        level[frontier] = depth
+
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        frontier = np.unique(neighbors[offsets])
+        frontier = frontier[level[frontier] < 0]
+        depth += 1
+    return level
+
+
+def barycenters(src, dst, values, count, target, reference):
+    """
+    Mean value of the reference neighbors of every target switch, NaN where there is none.
+    """
+    selected = target[src] & reference[dst]
+    sums = np.bincount(src[selected], weights=values[dst[selected]], minlength=count)
+    counts = np.bincount(src[selected], minlength=count)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def fan_radius(counts, spread):
+    return np.maximum(MIN_HOST_DISTANCE, counts * HOST_SPACING / spread)
+
+
+def fan_width(counts, spread):
+    """
+    Room a switch needs next to its neighbors for its fan of hosts.
+    """
+    radius = fan_radius(counts, spread)
+    return np.maximum(1.0, np.where(counts > 0, 2 * radius * math.sin(min(spread, math.pi) / 2), 0))
+
+
+def fan_hosts(centers, host_switch, directions, spread):
+    """
+    Spread the hosts of every switch evenly over an arc of the given angle centered on its direction.
+    Hosts without a switch are put in a row below everything else.
+    """
+    positions = np.zeros((len(host_switch), 2))
+    attached = host_switch >= 0
+    switch = host_switch[attached]
+
+    counts = np.bincount(switch, minlength=len(centers))
+    order = np.argsort(switch, kind='stable')
+    rank = np.empty(len(switch), dtype=int)
+    rank[order] = np.arange(len(switch)) - (np.cumsum(counts) - counts)[switch[order]]
+
+    spread = np.broadcast_to(spread, (len(centers),))[switch]
+    angle = directions[switch] + spread * ((rank + 0.5) / counts[switch] - 0.5)
+    radius = fan_radius(counts[switch], spread)
+    positions[attached] = centers[switch] + radius[:, None] * np.column_stack((np.cos(angle), np.sin(angle)))
+
+    orphans = np.flatnonzero(~attached)
+    if orphans.size:
+        bottom = min(centers[:, 1].min(initial=0), positions[attached, 1].min(initial=0)) - 1
+        positions[orphans] = np.column_stack(((np.arange(orphans.size) - (orphans.size - 1) / 2) * HOST_SPACING,
+            np.full(orphans.size, bottom)))
+    return positions
+
+
+def normalize(coordinates):
+    """
+    Center the coordinates and scale them into [-1, 1] keeping the aspect ratio, like the spring layout.
+    """
+    if not len(coordinates):
+        return coordinates
+    low = coordinates.min(axis=0)
+    high = coordinates.max(axis=0)
+    extent = (high - low).max()
+    return (coordinates - (low + high) / 2) * (2 / extent if extent else 1)
+
+
+class StructuredLayout():
+    """
+    Base of the layouts that place the switches from the structure of the switch graph and fan the hosts around them.
+    Subclasses implement place_switches, which returns the switch coordinates,
+    the direction the hosts of every switch are fanned out to and the angle they are spread over.
+    """
+
+    def __init__(self):
+        self.positions = {}
+
+    def clear(self):
+        self.positions.clear()
+
+    def update(self, G):
+        switches, hosts, src, dst, host_switch = graph_arrays(G)
+        host_counts = np.bincount(host_switch[host_switch >= 0], minlength=len(switches))
+
+        centers, directions, spread = self.place_switches(G, switches, src, dst, host_counts)
+        coordinates = normalize(np.concatenate((centers, fan_hosts(centers, host_switch, directions, spread))))
+
+        self.positions = dict(zip(switches + hosts, coordinates))
+        return self.positions
+
+    def place_switches(self, G, switches, src, dst, host_counts):
+        raise NotImplementedError
+
+
+class LayeredLayout(StructuredLayout):
+    """
+    Leaf/spine and fat-tree style layers: switches with hosts at the bottom, every other switch one layer
+    above its closest leaf. Switches in a layer are ordered by the mean position of their neighbors in the
+    layer below, sweeping up a few times to group the pods, and the hosts hang below their leaf.
+    """
+
+    SWEEPS = 3
+
+    def place_switches(self, G, switches, src, dst, host_counts):
+        count = len(switches)
+        leaves = np.flatnonzero(host_counts)
+        level = bfs_levels(src, dst, count, leaves if leaves.size else [], stack=False)
+        layers = [np.flatnonzero(level == depth) for depth in range(level.max(initial=-1) + 1)]
+        widths = fan_width(host_counts, LAYERED_HOST_SPREAD)
+
+        x = np.zeros(count)
+        for layer in layers:
+            self.place_layer(layer, widths, x)
+
+        for sweep in range(self.SWEEPS):
+            # Only the leaves follow the layer above, reordering the middle layers by the top one mixes up the pods
+            if sweep and len(layers) > 1:
+                self.reorder_layer(layers[0], level == 1, src, dst, widths, x)
+            for depth in range(1, len(layers)):
+                self.reorder_layer(layers[depth], level == depth - 1, src, dst, widths, x)
+
+        # Wide layers get further apart so the picture does not end up as a flat strip
+        distance = max(LAYER_DISTANCE, (x.max(initial=0) - x.min(initial=0)) / (2 * max(len(layers), 1)))
+        centers = np.column_stack((x, level * distance))
+        return centers, np.full(count, -math.pi / 2), LAYERED_HOST_SPREAD
+
+    @staticmethod
+    def place_layer(order, widths, x):
+        """
+        Put the switches of a layer next to each other in the given order, each taking the width of its fan.
+        """
+        edges = np.cumsum(widths[order])
+        x[order] = edges - widths[order] / 2 - edges[-1] / 2
+
+    def reorder_layer(self, layer, reference, src, dst, widths, x):
+        target = np.zeros(len(x), dtype=bool)
+        target[layer] = True
+        keys = barycenters(src, dst, x, len(x), target, reference)[layer]
+        keys = np.where(np.isnan(keys), x[layer], keys)
+        self.place_layer(layer[np.argsort(keys, kind='stable')], widths, x)
+
+
+class RadialLayout(StructuredLayout):
+    """
+    Radial tree rooted at a chosen switch (the one with the most links by default): every ring holds the
+    switches one hop further away, ordered by the angle of their neighbors on the inner ring,
+    with the hosts fanned outwards.
+    """
+
+    def __init__(self, root=None):
+        super().__init__()
+        self.root = root
+
+    def find_root(self, G, switches, src):
+        for i, switch in enumerate(switches):
+            if self.root in (switch, G.nodes[switch]['name']):
+                return i
+        return int(np.argmax(np.bincount(src, minlength=len(switches))))
+
+    def place_switches(self, G, switches, src, dst, host_counts):
+        count = len(switches)
+        if not count:
+            return np.zeros((0, 2)), np.zeros(0), 2 * math.pi
+        level = bfs_levels(src, dst, count, [self.find_root(G, switches, src)], stack=True)
+        widths = fan_width(host_counts, RADIAL_HOST_SPREAD)
+        ring_distance = LAYER_DISTANCE + fan_radius(host_counts, RADIAL_HOST_SPREAD).max()
+
+        angle = np.zeros(count)
+        radius = np.zeros(count)
+        previous = 0.0
+        for depth in range(1, level.max() + 1):
+            ring = np.flatnonzero(level == depth)
+            keys = barycenters(src, dst, angle, count, level == depth, level == depth - 1)[ring]
+            ring = ring[np.argsort(np.where(np.isnan(keys), 2 * math.pi, keys), kind='stable')]
+
+            edges = np.cumsum(widths[ring])
+            previous = max(previous + ring_distance, edges[-1] / (2 * math.pi))
+            angle[ring] = 2 * math.pi * (edges - widths[ring] / 2) / edges[-1]
+            radius[ring] = previous
+
+        centers = radius[:, None] * np.column_stack((np.cos(angle), np.sin(angle)))
+        spread = np.where(level == 0, 2 * math.pi, RADIAL_HOST_SPREAD)
+        return centers, angle, spread
+
+
+class FannedLayout(StructuredLayout):
+    """
+    Spring layout of the switches only, kept stable across refreshes, with the hosts fanned in a circle
+    around their switch. Hosts usually outnumber switches by far, so this is much cheaper than a spring
+    layout of the whole graph.
+    """
+
+    def __init__(self, iterations=WARM_ITERATIONS, seed=None):
+        super().__init__()
+        self.switch_layout = LayoutCache(iterations, seed)
+
+    def clear(self):
+        super().clear()
+        self.switch_layout.clear()
+
+    def place_switches(self, G, switches, src, dst, host_counts):
+        spread = 2 * math.pi
+        positions = self.switch_layout.update(G.subgraph(switches))
+        centers = np.array([positions[switch] for switch in switches], dtype=float).reshape(-1, 2)
+        # Spring positions are in [-1, 1], give every switch room for its hosts
+        scale = math.sqrt(max(len(switches), 1)) * (LAYER_DISTANCE + fan_radius(host_counts, spread).max(initial=0))
+        return centers * scale, np.zeros(len(switches)), spread
+
+
+LAYOUTS = {
+    'spring': LayoutCache,
+    'fanned': FannedLayout,
+    'layered': LayeredLayout,
+    'radial': RadialLayout,
+}
+
+
+def make_layout(name, **options):
+    if name not in LAYOUTS:
+        raise ValueError(f"Unknown layout {name}, choose one of {', '.join(LAYOUTS)}")
+    return LAYOUTS[name](**options)
@@ -0,0 +1,71 @@
+"""
+Background worker computing node layouts off the Qt GUI thread.
+"""
+
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+class LayoutWorker(QObject):
+    """
+    Owns the layout engine and runs it on a single background thread, so the engine state is only touched there.
+    Every request carries a copy of the graph. Requests overtaken by a newer one before they started are skipped,
+    and the request id is published with the positions so receivers can drop results that arrive late.
+    """
+
+    logger = logging.getLogger('LayoutWorker')
+
+    positions_signal = pyqtSignal(int, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='layout-worker')
+        self.counter = itertools.count(1)
+        self.latest = 0
+        self.layout_name = 'spring'
+        self.layout_options = {}
+        self.engine = None
+
+    def set_layout(self, name, **options):
+        """
+        Choose the layout engine, see layout.LAYOUTS. Takes effect on the next request.
+        """
+        self.layout_name = name
+        self.layout_options = options
+        self.engine = None
+
+    def request(self, graph):
+        request_id = next(self.counter)
+        self.latest = request_id
+
+        def done(finished):
+            if not finished.cancelled() and finished.exception() is not None:
+                self.logger.error(f"Layout failed: {finished.exception()}")
+
+        future = self.executor.submit(self.compute, request_id, graph)
+        future.add_done_callback(done)
+        return request_id
+
+    def compute(self, request_id, graph):
+        if request_id != self.latest:
+            return
+
+        # NumPy and networkx are only needed once there is something to lay out
+        from layout import make_layout
+
+        if self.engine is None:
+            self.engine = make_layout(self.layout_name, **self.layout_options)
+        start = time.perf_counter()
+        # The engine keeps updating its own dict, publish a copy
+        positions = dict(self.engine.update(graph))
+        self.logger.debug(f"Layout of {len(graph)} nodes took {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        if request_id == self.latest:
+            self.positions_signal.emit(request_id, graph, positions)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -1,15 +1,7 @@
-import matplotlib as mpl
-from svgpath2mpl import parse_path
+import hashlib
+import os
 
-class MarkerGenerator():
-    """
-    Class for creating the custom markers used for displaying switches and hosts.
-    Since NetworkX does not support custom images by default, the markers are converted to .svg.
-    Their respective SVG path values are stored, transformed and used in the underlying matplotlib function.
-    """
-    
-    def __init__(self):
-        self.host_marker = parse_path("""M 88.62,151.12
+HOST_MARKER_SVG = """M 88.62,151.12
            C 88.62,151.12 85.62,153.50 85.62,153.50
              85.62,153.50 85.25,295.88 85.25,295.88
              85.00,397.87 85.38,439.12 86.38,441.50
@@ -91,9 +83,9 @@ class MarkerGenerator():
              41.25,488.50 41.25,480.00 41.25,480.00
              41.25,480.00 143.12,480.00 143.12,480.00
              143.12,480.00 245.00,480.00 245.00,480.00
-             245.00,480.00 245.00,484.12 245.00,484.12 Z""")
+             245.00,480.00 245.00,484.12 245.00,484.12 Z"""
 
-        self.switch_marker = parse_path("""M 87.50,612.50
+SWITCH_MARKER_SVG = """M 87.50,612.50
            C 87.50,612.50 87.50,625.00 87.50,625.00
              87.50,625.00 100.00,625.00 100.00,625.00
              100.00,625.00 112.50,625.00 112.50,625.00
@@ -340,14 +332,87 @@ class MarkerGenerator():
              50.00,568.75 50.00,475.00 50.00,475.00
              50.00,475.00 400.00,475.00 400.00,475.00
              400.00,475.00 750.00,475.00 750.00,475.00
-             750.00,475.00 750.00,568.75 750.00,568.75 Z""")
+             750.00,475.00 750.00,568.75 750.00,568.75 Z"""
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'marker_cache.npz')
+CACHE_VERSION = '1'
+
+
+def source_key():
+    """
+    Hash of the SVG sources, a cache built from different paths is rebuilt.
+    """
+    digest = hashlib.sha1(CACHE_VERSION.encode())
+    digest.update(HOST_MARKER_SVG.encode())
+    digest.update(SWITCH_MARKER_SVG.encode())
+    return digest.hexdigest()
+
+
+class MarkerGenerator():
+    """
+    Class for creating the custom markers used for displaying switches and hosts.
+    Since NetworkX does not support custom images by default, the markers are converted to .svg.
+    Their respective SVG path values are stored, transformed and used in the underlying matplotlib function.
+    Parsing the SVG paths is slow, so the normalized vertices and codes are cached in a .npz file
+    and the markers are only loaded when first used.
+    """
+
+    def __init__(self, cache_path=CACHE_PATH):
+        self.cache_path = cache_path
+        self.markers = None
+
+    @property
+    def host_marker(self):
+        return self.load()['host']
+
+    @property
+    def switch_marker(self):
+        return self.load()['switch']
+
+    def load(self):
+        if self.markers is None:
+            self.markers = self.load_cache()
+        if self.markers is None:
+            self.markers = self.build()
+            self.save_cache()
+        return self.markers
+
+    def load_cache(self):
+        import numpy as np
+        from matplotlib.path import Path
+
+        try:
+            with np.load(self.cache_path) as cache:
+                if str(cache['key']) != source_key():
+                    return None
+                return {name: Path(cache[f"{name}_vertices"], cache[f"{name}_codes"]) for name in ('host', 'switch')}
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save_cache(self):
+        import numpy as np
 
-        self.host_marker.vertices -= self.host_marker.vertices.mean(axis=0)
-        self.host_marker = self.host_marker.transformed(mpl.transforms.Affine2D().rotate_deg(180))
-        self.host_marker = self.host_marker.transformed(mpl.transforms.Affine2D().scale(-1,1))
+        arrays = {'key': source_key()}
+        for name, path in self.markers.items():
+            arrays[f"{name}_vertices"] = path.vertices
+            arrays[f"{name}_codes"] = path.codes
+        try:
+            with open(self.cache_path, 'wb') as cache_file:
+                np.savez(cache_file, **arrays)
+        except OSError:
+            # Not fatal, the markers are just parsed again next time
+            pass
 
-        self.switch_marker.vertices -= self.switch_marker.vertices.mean(axis=0)
-        self.switch_marker = self.switch_marker.transformed(mpl.transforms.Affine2D().rotate_deg(180))
-        self.switch_marker = self.switch_marker.transformed(mpl.transforms.Affine2D().scale(-1,1))
+    @staticmethod
+    def build():
+        import matplotlib as mpl
+        from svgpath2mpl import parse_path
 
-        
\ No newline at end of file
+        markers = {}
+        for name, svg in (('host', HOST_MARKER_SVG), ('switch', SWITCH_MARKER_SVG)):
+            marker = parse_path(svg)
+            marker.vertices -= marker.vertices.mean(axis=0)
+            marker = marker.transformed(mpl.transforms.Affine2D().rotate_deg(180))
+            marker = marker.transformed(mpl.transforms.Affine2D().scale(-1,1))
+            markers[name] = marker
+        return markers
@@ -0,0 +1,245 @@
+"""
+Mininet side of the app: builds the network and applies topology changes to it.
+Has no Qt dependency, so it is shared by the GUI thread wrapper and the headless runner.
+"""
+
+import ipaddress
+import logging
+import time
+import requests
+
+from topos import DualSwitchTopo
+from mininet.net import Mininet
+from mininet.node import RemoteController, Switch
+from rest_client import TopologyClient
+
+READY_TIMEOUT = 5000
+READY_POLL_INTERVAL = 10
+READY_MAX_POLL_INTERVAL = 250
+DISCOVERY_TIMEOUT = 15000
+
+# One unsolicited ARP per host, a broadcast ping is the fallback when arping is not installed
+ANNOUNCE_COMMAND = 'arping -q -c 1 -U -I {intf} {ip} || ping -q -c 1 -W 1 -b {broadcast}'
+
+class MininetEngine():
+    """
+    Owns the Mininet network and implements the topology modifying functions.
+    on_change is called after every change once Ryu reports it (or the wait timed out).
+    """
+
+    logger = logging.getLogger('MininetEngine')
+
+    def __init__(self, topo=None, on_change=None):
+        self.on_change = on_change or (lambda: None)
+        self.rest_client = TopologyClient()
+        self.topo = topo or DualSwitchTopo()
+        c1 = RemoteController('c1')
+        self.net = Mininet(topo=self.topo, controller=c1)
+
+    def start(self):
+        self.net.start()
+
+        expected_dpids = {switch.dpid for switch in self.net.switches}
+        expected_ports = {(switch.dpid, intf.name) for switch in self.net.switches
+            for intf in switch.intfList() if intf.name != 'lo'}
+        expected_links = {(link.intf1.node.dpid, link.intf2.node.dpid) for link in self.net.links
+            if isinstance(link.intf1.node, Switch) and isinstance(link.intf2.node, Switch)}
+        self.discover(expected_dpids, expected_ports, expected_links, self.net.hosts, 'startup topology',
+            DISCOVERY_TIMEOUT)
+        self.on_change()
+
+    def discover(self, expected_dpids, expected_ports, expected_links, hosts, description, timeout=READY_TIMEOUT):
+        """
+        Wait until Ryu reports the expected switches, ports and links, then announce the hosts and wait for their MACs.
+        Hosts are only announced afterwards, otherwise Ryu could learn them on a not yet discovered link port.
+        """
+        self.wait_until(lambda: self.batch_ready(expected_dpids, expected_ports, expected_links, set()),
+            f"switches and links of {description} are up", timeout)
+
+        if hosts:
+            self.announce_hosts(hosts)
+            expected_macs = {host.MAC() for host in hosts}
+            self.wait_until(lambda: self.batch_ready(set(), set(), set(), expected_macs),
+                f"Ryu knows the {len(expected_macs)} hosts of {description}", timeout)
+
+    def announce_hosts(self, hosts):
+        """
+        Make every host send a single frame so Ryu's host tracker learns it, O(hosts) instead of pingAll's O(hosts^2).
+        The commands are started on all hosts first and collected afterwards, so they run in parallel.
+        """
+        started = []
+        for host in hosts:
+            intf = host.defaultIntf()
+            if not intf or not host.IP():
+                continue
+            broadcast = ipaddress.ip_interface(f"{host.IP()}/{intf.prefixLen}").network.broadcast_address
+            host.sendCmd(ANNOUNCE_COMMAND.format(intf=intf.name, ip=host.IP(), broadcast=broadcast))
+            started.append(host)
+
+        for host in started:
+            host.waitOutput()
+
+    def stop(self):
+        self.net.stop()
+        self.rest_client.close()
+
+    def wait_until(self, condition, description, timeout=READY_TIMEOUT):
+        """
+        Poll condition() with exponential backoff until it holds or timeout (ms) runs out.
+        Used instead of fixed sleeps to wait for Ryu to notice a change.
+        """
+        start = time.monotonic()
+        delay = READY_POLL_INTERVAL
+
+        while True:
+            try:
+                if condition():
+                    self.logger.debug(f"{description} after {self.elapsed_ms(start)} ms")
+                    return True
+            except (requests.RequestException, ValueError) as ex_ready:
+                self.logger.debug(f"Readiness check failed: {ex_ready}")
+
+            remaining = timeout - self.elapsed_ms(start)
+            if remaining <= 0:
+                self.logger.warning(f"Timed out waiting until {description}")
+                return False
+
+            time.sleep(min(delay, remaining) / 1000)
+            delay = min(delay * 2, READY_MAX_POLL_INTERVAL)
+
+    @staticmethod
+    def elapsed_ms(start):
+        return int((time.monotonic() - start) * 1000)
+
+    @staticmethod
+    def peer_intf(intf):
+        if not intf or not intf.link:
+            return None
+        return intf.link.intf2 if intf.link.intf1 is intf else intf.link.intf1
+
+    def port_present(self, switch, port_name):
+        ports = self.rest_client.get_switch_ports(switch.dpid)
+        return ports is not None and port_name in ports
+
+    def add_host(self, values):
+        return self.apply_batch({'hosts': [values]})
+
+    def add_switch(self, values):
+        return self.apply_batch({'switches': [values]})
+
+    def remove_host(self, host_name):
+        host_node = self.net.get(host_name)
+        peer = self.peer_intf(host_node.defaultIntf())
+
+        # Detach the switch side like apply_batch attaches it, so the port is really removed from the switch
+        if peer:
+            peer.node.detach(peer)
+        self.net.delHost(host_node)
+
+        if peer:
+            self.wait_until(lambda: not self.port_present(peer.node, peer.name), f"{peer.name} is gone")
+        self.on_change()
+
+    def remove_switch(self, switch_name, dpid):
+        switch_node = self.net.get(switch_name)
+
+        for intf in switch_node.intfList():
+            peer = self.peer_intf(intf)
+            if peer is None:
+                continue
+            # Hosts of the switch go with it, neighbour switches only lose their port to it
+            if isinstance(peer.node, Switch):
+                peer.node.detach(peer)
+            else:
+                self.net.delHost(peer.node)
+
+        self.net.delSwitch(switch_node)
+        self.wait_until(lambda: self.rest_client.get_switch_ports(dpid) is None, f"{switch_name} is gone")
+        self.on_change()
+
+    def apply_batch(self, batch):
+        """
+        Add switches, hosts and links in one pass.
+        batch holds optional 'switches' ({'name', 'dpid', 'link_to'}), 'hosts' ({'name', 'mac', 'switch'})
+        and 'links' ({'node1', 'node2'}) lists. New switches are started together, Ryu is waited on once
+        and a single refresh is emitted. If anything fails, every node added by the batch is removed again
+        and False is returned.
+        """
+        new_switches = []
+        new_hosts = []
+        new_links = []
+        expected_ports = set()
+        expected_links = set()
+
+        try:
+            for values in batch.get('switches', []):
+                new_switches.append(self.net.addSwitch(values['name'], dpid=values['dpid']))
+            new_switch_names = {switch.name for switch in new_switches}
+
+            links = [(switch_name, values['name']) for values in batch.get('switches', [])
+                for switch_name in values.get('link_to', [])]
+            links += [(values['node1'], values['node2']) for values in batch.get('links', [])]
+
+            for values in batch.get('hosts', []):
+                host = self.net.addHost(values['name'], mac=values.get('mac'))
+                new_hosts.append(host)
+                links.append((values['name'], values['switch']))
+
+            for name1, name2 in links:
+                node1, node2 = self.net.get(name1, name2)
+                link = self.net.addLink(node1, node2)
+                new_links.append(link)
+                for node, intf in ((node1, link.intf1), (node2, link.intf2)):
+                    if isinstance(node, Switch):
+                        expected_ports.add((node.dpid, intf.name))
+                        # Running switches need the new port attached, new ones get it on start
+                        if node.name not in new_switch_names:
+                            node.attach(intf)
+                if isinstance(node1, Switch) and isinstance(node2, Switch):
+                    expected_links.add((node1.dpid, node2.dpid))
+
+            for switch in new_switches:
+                switch.start(self.net.controllers)
+
+            for host in new_hosts:
+                if host.defaultIntf():
+                    host.configDefault()
+
+        except Exception as ex_batch:
+            self.logger.exception(ex_batch)
+            self.rollback(new_switches, new_hosts, new_links)
+            self.on_change()
+            return False
+
+        # A switch without links has no port to wait for, so the switch itself is expected as well
+        expected_dpids = {switch.dpid for switch in new_switches}
+        self.discover(expected_dpids, expected_ports, expected_links, new_hosts,
+            f"batch of {len(new_switches)} switches and {len(new_hosts)} hosts")
+        self.on_change()
+        return True
+
+    def batch_ready(self, expected_dpids, expected_ports, expected_links, expected_macs):
+        # One snapshot per poll, however large the batch is
+        switches, hosts, links = self.rest_client.get_full_topology()
+        dpids = {switch['dpid'] for switch in switches}
+        ports = {(switch['dpid'], port['name']) for switch in switches for port in switch['ports']}
+        reported_links = {(link['src']['dpid'], link['dst']['dpid']) for link in links}
+        reported_links |= {(dst, src) for src, dst in reported_links}
+        reported_macs = {host['mac'] for host in hosts}
+        return (expected_dpids <= dpids and expected_ports <= ports and
+            expected_links <= reported_links and expected_macs <= reported_macs)
+
+    def rollback(self, new_switches, new_hosts, new_links):
+        new_nodes = set(new_switches) | set(new_hosts)
+        for link in new_links:
+            for intf in (link.intf1, link.intf2):
+                if isinstance(intf.node, Switch) and intf.node not in new_nodes:
+                    intf.node.detach(intf)
+            # Links touching a new node go away with that node
+            if link.intf1.node not in new_nodes and link.intf2.node not in new_nodes:
+                self.net.delLink(link)
+
+        for host in new_hosts:
+            self.net.delHost(host)
+        for switch in new_switches:
+            self.net.delSwitch(switch)
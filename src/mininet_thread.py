@@ -1,81 +1,93 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtCore import QThread, pyqtSignal, pyqtSlot
 
-from topos import DualSwitchTopo
-from mininet.net import Mininet
 from mininet.cli import CLI
-from mininet.node import RemoteController
+from mininet_engine import MininetEngine
 
 class MininetThread(QThread):
     """
     The thread which is responsible for running Mininet.
-    The topology modifying functions are also here.
+    The topology modifying slots are forwarded to the MininetEngine.
     """
 
+    logger = logging.getLogger('MininetThread')
+
     refresh_topology_signal = pyqtSignal()
-    update_ids_signal = pyqtSignal(dict, dict)
+    host_removed_signal = pyqtSignal(str, str)
+    switch_removed_signal = pyqtSignal(str, str)
+    batch_failed_signal = pyqtSignal(dict)
 
     def __init__(self, parent=None):
         QThread.__init__(self, parent)
-        self.topo = DualSwitchTopo()
-        c1 = RemoteController('c1')
-        self.net = Mininet(topo=self.topo, controller=c1)
+        self.engine = None
+
+        # Slots of this object run on the GUI thread and run() is busy with the CLI,
+        # so changes are serialized on a single worker instead of blocking the GUI while waiting for Ryu
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mininet-ops')
+        # Building the network is slow and every change needs it, so it is the first job of the worker
+        self.engine_started = self.executor.submit(self.start_engine)
+
+    @property
+    def net(self):
+        return self.engine.net if self.engine is not None else None
 
     def run(self):
-        self.update_ids_signal.emit(self.topo.ids, self.topo.switch_info)
-        self.net.start()
-        self.net.pingAll()
-        self.refresh_topology_signal.emit()
+        try:
+            self.engine_started.result()
+        except Exception as ex_start:
+            self.logger.exception(ex_start)
+            return
 
         CLI(self.net)
 
+    def start_engine(self):
+        self.engine = MininetEngine(on_change=self.refresh_topology_signal.emit)
+        self.engine.start()
 
-    @pyqtSlot(dict)
-    def add_host(self, values):
-        host_name = values.get('name')
-        host_mac = values.get('mac')
-        switch = self.net.get(values.get('switch'))
-
-        new_host = self.net.addHost(host_name, mac=host_mac)
-        new_link = self.net.addLink(new_host, switch)
-        switch.attach(new_link.intf2)
+    def submit(self, method, *args):
+        # The engine method is looked up on the worker, so a change requested while Mininet starts waits for it
+        future = self.executor.submit(lambda: getattr(self.engine, method)(*args))
+        future.add_done_callback(self.report_failure)
+        return future
 
-        if new_host.defaultIntf():
-            new_host.configDefault()
+    def report_failure(self, future):
+        if future.exception() is not None:
+            self.logger.error(f"Topology change failed: {future.exception()}")
 
-        self.msleep(500)
+    @staticmethod
+    def emit_on_success(future, signal, *args):
+        # Called on the worker, the signal is queued to the GUI thread
+        if future.exception() is None:
+            signal.emit(*args)
 
-        self.refresh_topology_signal.emit()
+    def submit_batch(self, batch):
+        future = self.submit('apply_batch', batch)
+        future.add_done_callback(lambda done: self.report_batch(done, batch))
 
-    @pyqtSlot(str)
-    def remove_host(self, host_name):
-        host_node = self.net.get(host_name)
-        self.net.delHost(host_node)
-        self.msleep(500)
-        self.refresh_topology_signal.emit()
+    def report_batch(self, future, batch):
+        # A failed batch is rolled back, so whatever it reserved can be handed out again
+        if future.exception() is not None or not future.result():
+            self.batch_failed_signal.emit(batch)
 
     @pyqtSlot(dict)
-    def add_switch(self, values):
-        new_switch = self.net.addSwitch(values['name'], dpid=values['dpid'])
-
-        for switch_name in values['link_to']:
-            switch = self.net.get(switch_name)
-            link = self.net.addLink(switch, new_switch)
-            switch.attach(link.intf1)
-
-        new_switch.start(self.net.controllers)
+    def add_host(self, values):
+        self.submit_batch({'hosts': [values]})
 
-        self.msleep(500)
-        self.refresh_topology_signal.emit()
+    @pyqtSlot(str, str)
+    def remove_host(self, host_name, mac):
+        future = self.submit('remove_host', host_name)
+        future.add_done_callback(lambda done: self.emit_on_success(done, self.host_removed_signal, host_name, mac))
 
-    @pyqtSlot(str, str, dict)
-    def remove_switch(self, switch_name, dpid, switch_info):
-        switch_node = self.net.get(switch_name)
-        hosts_to_delete = switch_info[dpid]['hosts']
+    @pyqtSlot(dict)
+    def add_switch(self, values):
+        self.submit_batch({'switches': [values]})
 
-        for host in hosts_to_delete:
-            host_node = self.net.get(host[0])
-            self.net.delHost(host_node)
+    @pyqtSlot(str, str)
+    def remove_switch(self, switch_name, dpid):
+        future = self.submit('remove_switch', switch_name, dpid)
+        future.add_done_callback(lambda done: self.emit_on_success(done, self.switch_removed_signal, switch_name, dpid))
 
-        self.net.delSwitch(switch_node)
-        self.msleep(500)
-        self.refresh_topology_signal.emit()
+    @pyqtSlot(dict)
+    def apply_batch(self, batch):
+        self.submit_batch(batch)
@@ -1,27 +1,21 @@
+from startup_timer import StartupTimer
+import argparse
 import sys
-import requests
 import logging
-import re
 from dialogs import AddHostDialog, AddSwitchDialog, RemoveHostDialog, RemoveSwitchDialog, ManageFlowsDialog
 from PyQt6.QtWidgets import QApplication, QMainWindow
-from PyQt6.QtCore import pyqtSignal, pyqtSlot
-from json import JSONDecodeError
-from mininet_thread import MininetThread
+from PyQt6.QtCore import QTimer, pyqtSignal, pyqtSlot
+from refresh_scheduler import RefreshScheduler
+from id_allocator import IdAllocator
+from topology import Host, Link, Switch, TopologyModel, records_from_snapshot, switch_name
+from topology_diff import TopologyDiff, diff_snapshots, index_snapshot
 
 from ui.ui_main_window import Ui_MainWindow
 
 sys.path.append(".")
 
-RYU_URL = 'http://0.0.0.0:8080/'
 VERSION = '0.1'
 
-LINKS_URL = RYU_URL + 'v1.0/topology/links'
-SWITCHES_URL = RYU_URL + 'v1.0/topology/switches'
-HOSTS_URL = RYU_URL + 'v1.0/topology/hosts'
-GET_FLOWS_URL = RYU_URL + 'stats/flow/'
-ADD_FLOW_URL = RYU_URL + 'stats/flowentry/add'
-DELETE_FLOW_URL = RYU_URL + 'stats/flowentry/delete'
-
 class MainWindow(QMainWindow, Ui_MainWindow):
     """
     Main Window handling core app.
@@ -37,42 +31,114 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     logger.addHandler(handler)
 
     add_host_signal = pyqtSignal(dict)
-    remove_host_signal = pyqtSignal(str)
+    remove_host_signal = pyqtSignal(str, str)
     add_switch_signal = pyqtSignal(dict)
-    remove_switch_signal = pyqtSignal(str, str, dict)
+    remove_switch_signal = pyqtSignal(str, str)
 
-    ids = {'dpid': 0, 'host': 0, 'mac': 0}
-    links = {}
-    switches = {}
-    hosts = {}
-    switch_info = {}
+    mininet_host_names = {}
 
-    def __init__(self, parent=None):
+    def __init__(self, startup_timer=None, layout='spring', layout_root=None, renderer='matplotlib',
+            flow_poll_interval=10, parent=None):
         super().__init__()
+        self.startup_timer = startup_timer or StartupTimer()
+        self.topology = TopologyModel()
+        self.id_allocator = IdAllocator()
         self.setupUi(self)
         self.setWindowTitle(F"MnGUI v{VERSION}")
+        if renderer == 'scene':
+            self.use_scene_renderer()
+        self.canvas_widget.set_layout(layout, **({'root': layout_root} if layout_root else {}))
+        self.canvas_widget.plotted_signal.connect(self.topology_plotted)
+        self.refresh_scheduler = RefreshScheduler(parent=self)
+        self.refresh_scheduler.refresh_signal.connect(self.refresh_topology)
+        # The model takes every event at once, the plot and the poller get the merged diff of a burst
+        self.plotted_diff = TopologyDiff()
+        self.plot_scheduler = RefreshScheduler(parent=self)
+        self.plot_scheduler.refresh_signal.connect(self.plot_topology)
+        self.rest_client = None
+        self.rest_worker = None
+        self.flow_poll_interval = flow_poll_interval
+        self.flow_cache = None
+        self.flow_poller = None
+        self.mininet_thread = None
+        self.topology_subscriber = None
+        # Hosts of switches being removed, their IDs are released once Mininet is done
+        self.removed_switch_hosts = {}
+
+        # The controls need the backend, which is only started once the window is on screen
+        self.sidebar_frame.setEnabled(False)
+        self.statusbar.showMessage("Starting Mininet...")
+        QTimer.singleShot(0, self.start_backend)
+
+        # Setup API Slots and Signals
+        self.add_host_button.clicked.connect(self.load_add_host_dialog)
+        self.remove_host_button.clicked.connect(self.load_remove_host_dialog)
+        self.add_switch_button.clicked.connect(self.load_add_switch_dialog)
+        self.remove_switch_button.clicked.connect(self.load_remove_switch_dialog)
+        self.manage_flow_btn.clicked.connect(self.load_manage_flows_dialog)
+        self.refresh_button.clicked.connect(self.refresh_scheduler.request)
+        self.refresh_button.clicked.connect(self.canvas_widget.fit_view)
+
+        self.startup_timer.mark('Window setup')
+
+    def use_scene_renderer(self):
+        # The generated UI always creates the matplotlib canvas, swap it for the scene in place
+        from ui.scene_widget import SceneWidget
+
+        scene_widget = SceneWidget(self.central_widget)
+        scene_widget.setSizePolicy(self.canvas_widget.sizePolicy())
+        scene_widget.setObjectName("canvas_widget")
+        self.main_layout.replaceWidget(self.canvas_widget, scene_widget)
+        self.canvas_widget.shutdown()
+        self.canvas_widget.deleteLater()
+        self.canvas_widget = scene_widget
+
+    def start_backend(self):
+        self.startup_timer.mark('First frame')
+
+        # Imported here so requests and Mininet are not loaded before the window is shown
+        from mininet_thread import MininetThread
+        from flow_poller import FlowCache, FlowPoller
+        from rest_client import TopologyClient
+        from rest_worker import RestWorker
+        from topology_subscriber import TopologySubscriber
+
+        self.rest_client = TopologyClient()
+        self.rest_worker = RestWorker(self.rest_client, parent=self)
+        self.rest_worker.topology_signal.connect(self.update_topology)
+        self.rest_worker.error_signal.connect(self.statusbar.showMessage)
+
+        # Flow statistics of every switch are polled in the background, 0 turns this off
+        if self.flow_poll_interval > 0:
+            self.flow_cache = FlowCache()
+            self.flow_poller = FlowPoller(self.rest_client, self.flow_cache,
+                interval=int(self.flow_poll_interval * 1000), parent=self)
+            self.canvas_widget.flow_cache = self.flow_cache
+            self.flow_poller.start()
 
         # Setup Mininet Thread with required Slots and Signals
         self.mininet_thread = MininetThread(parent=self)
-        self.mininet_thread.refresh_topology_signal.connect(self.refresh_topology)
-        self.mininet_thread.update_ids_signal.connect(self.update_ids)
+        self.mininet_thread.refresh_topology_signal.connect(self.topology_changed)
+        self.mininet_thread.host_removed_signal.connect(self.host_removed)
+        self.mininet_thread.switch_removed_signal.connect(self.switch_removed)
+        self.mininet_thread.batch_failed_signal.connect(self.batch_failed)
         self.add_host_signal.connect(self.mininet_thread.add_host)
         self.remove_host_signal.connect(self.mininet_thread.remove_host)
         self.add_switch_signal.connect(self.mininet_thread.add_switch)
         self.remove_switch_signal.connect(self.mininet_thread.remove_switch)
         self.mininet_thread.start()
 
-        # Setup API Slots and Signals
-        self.add_host_button.clicked.connect(self.load_add_host_dialog)
-        self.remove_host_button.clicked.connect(self.load_remove_host_dialog)
-        self.add_switch_button.clicked.connect(self.load_add_switch_dialog)
-        self.remove_switch_button.clicked.connect(self.load_remove_switch_dialog)
-        self.manage_flow_btn.clicked.connect(self.load_manage_flows_dialog)
-        self.refresh_button.clicked.connect(self.refresh_topology)
+        # Setup ws_topology subscriber, a full refresh resyncs the model on every (re)connect
+        self.topology_subscriber = TopologySubscriber(parent=self)
+        self.topology_subscriber.topology_event_signal.connect(self.apply_topology_event)
+        self.topology_subscriber.connected_signal.connect(self.refresh_scheduler.request)
+        self.topology_subscriber.start()
+
+        self.startup_timer.mark('Backend started')
 
     def load_add_host_dialog(self):
         dialog = AddHostDialog(self)
-        dialog.init_selections(self.switches, self.ids)
+        dialog.init_selections(self.topology, self.id_allocator)
 
         if dialog.exec():
             new_host = {}
@@ -80,9 +146,16 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             new_host['mac'] = dialog.ui.mac_name.text()
             new_host['switch'] = dialog.ui.switch_box.currentText()
 
-            for _, value in self.switch_info.items():
-                if value['name'] == new_host['switch']:
-                    value['hosts'].append((new_host['name'], new_host['mac']))
+            try:
+                available = self.id_allocator.host_available(new_host['name'], new_host['mac'])
+            except ValueError:
+                available = False
+            if not available:
+                self.show_error(f"Host name {new_host['name']} or MAC {new_host['mac']} is invalid or in use.")
+                return
+
+            self.id_allocator.reserve_host(new_host['name'], new_host['mac'])
+            self.mininet_host_names[new_host['mac']] = new_host['name']
 
             self.add_host_signal.emit(new_host)
             self.logger.info("Adding host.")
@@ -91,31 +164,37 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def load_remove_host_dialog(self):
         dialog = RemoveHostDialog(self)
-        dialog.init_hosts_and_macs(self.hosts)
+        dialog.init_hosts_and_macs(self.topology)
         
         if dialog.exec():
             mac = dialog.ui.mac_name.text()
-            for _, value in self.switch_info.items():
-                for connection in value['hosts']:
-                    if connection[1] == mac:
-                        value['hosts'].remove(connection)
-                    break
-
-            self.remove_host_signal.emit(dialog.ui.host_box.currentText())
-            self.logger.info("Removed host.")
+
+            name = dialog.ui.host_box.currentText()
+
+            self.remove_host_signal.emit(name, mac)
+            self.logger.info("Removing host.")
         else:
             self.logger.info("Canceled remove host process.")
 
     def load_add_switch_dialog(self):
         dialog = AddSwitchDialog(self)
-        dialog.init_selections(self.switches, self.ids)
+        dialog.init_selections(self.topology, self.id_allocator)
 
         if dialog.exec():
             new_switch = {}
             new_switch['link_to'] = [switch.text() for switch in dialog.ui.switch_list.selectedItems()]
             new_switch['name'] = dialog.ui.switch_name.text()
             new_switch['dpid'] = dialog.ui.dpid_name.text()
-            self.switch_info[new_switch['dpid']] = {'name': new_switch['name'], 'hosts': []}
+
+            try:
+                dpid = int(new_switch['dpid'], 16)
+            except ValueError:
+                dpid = None
+            if dpid is None or not self.id_allocator.switch_available(new_switch['name'], dpid):
+                self.show_error(f"Switch name {new_switch['name']} or DPID {new_switch['dpid']} is invalid or in use.")
+                return
+
+            self.id_allocator.reserve_switch(new_switch['name'], dpid)
             self.add_switch_signal.emit(new_switch)
             self.logger.info("Adding switch.")
         else:
@@ -123,23 +202,29 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     def load_remove_switch_dialog(self):
         dialog = RemoveSwitchDialog(self)
-        dialog.init_ui(self.switches)
+        dialog.init_ui(self.topology)
 
         if dialog.exec():
-            copy = self.switch_info.copy()
-            self.switch_info.pop(dialog.ui.dpid_name.text())
-            self.remove_switch_signal.emit(dialog.ui.switch_box.currentText(), dialog.ui.dpid_name.text(), copy)
-            self.logger.info("Removed switch.")
+            switch = self.topology.switch_by_name(dialog.ui.switch_box.currentText())
+            # The switch_leave event drops its hosts from the model before Mininet reports back
+            self.removed_switch_hosts[switch.dpid] = list(self.topology.hosts_of(switch.dpid))
+            self.remove_switch_signal.emit(switch.name, switch.dpid)
+            self.logger.info("Removing switch.")
         else:
             self.logger.info("Canceled remove switch process.")
 
     def load_manage_flows_dialog(self):
         dialog = ManageFlowsDialog(self)
-        dialog.hosts = self.hosts.copy()
-        dialog.init_ui(self.switches)
+        dialog.hosts = list(self.topology.hosts.values())
+        dialog.flow_cache = self.flow_cache
+        dialog.init_ui(self.topology)
         dialog.get_flow_signal.connect(self.get_flow_request)
         dialog.delete_flow_signal.connect(self.delete_flow_request)
         dialog.add_flow_signal.connect(self.add_flow_request)
+        self.rest_worker.flows_signal.connect(dialog.update_flow_box)
+        self.rest_worker.flow_modified_signal.connect(dialog.flow_modified)
+        if self.flow_poller is not None:
+            self.flow_poller.flows_signal.connect(dialog.update_flow_box)
         dialog.get_flows(dialog.ui.switch_box.itemText(0))
 
         if dialog.exec():
@@ -147,89 +232,169 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         else:
             self.logger.info("Canceled flow management process.")
 
-    @pyqtSlot(str, object)
-    def get_flow_request(self, dpid, dialog):
-        response = requests.get(GET_FLOWS_URL + dpid)
-        dialog.update_flow_box(response.json()[dpid])
+        self.rest_worker.flows_signal.disconnect(dialog.update_flow_box)
+        self.rest_worker.flow_modified_signal.disconnect(dialog.flow_modified)
+        if self.flow_poller is not None:
+            self.flow_poller.flows_signal.disconnect(dialog.update_flow_box)
+
+    @pyqtSlot(str, str)
+    def host_removed(self, name, mac):
+        # ws_topology has no host removal event, so the removal is applied locally
+        self.apply_topology_event('event_host_delete', {'mac': mac})
+        self.id_allocator.release_host(name, mac)
+        self.logger.info(f"Removed host {name}.")
+
+    @pyqtSlot(str, str)
+    def switch_removed(self, name, dpid):
+        for host in self.removed_switch_hosts.pop(dpid, []):
+            self.mininet_host_names.pop(host.mac, None)
+            self.id_allocator.release_host(host.name, host.mac)
+        self.id_allocator.release_switch(name, int(dpid, 16))
+        self.logger.info(f"Removed switch {name}.")
+
+    @pyqtSlot(dict)
+    def batch_failed(self, batch):
+        # The IDs were reserved when the dialog was accepted
+        for host in batch.get('hosts', []):
+            self.mininet_host_names.pop(host['mac'], None)
+            self.id_allocator.release_host(host['name'], host['mac'])
+        for switch in batch.get('switches', []):
+            self.id_allocator.release_switch(switch['name'], int(switch['dpid'], 16))
+        names = ', '.join(values['name'] for values in batch.get('hosts', []) + batch.get('switches', []))
+        self.show_error(f"Adding {names} failed.")
+
+    @pyqtSlot(str)
+    def get_flow_request(self, dpid):
+        self.rest_worker.fetch_flows(dpid)
 
     @pyqtSlot(dict)
     def add_flow_request(self, request):
-        requests.post(ADD_FLOW_URL, json=request)
+        self.rest_worker.add_flow(request)
 
     @pyqtSlot(dict)
     def delete_flow_request(self, request):
-        requests.post(DELETE_FLOW_URL, json=request)
+        self.rest_worker.delete_flow(request)
 
 
-    @pyqtSlot(dict, dict)
-    def update_ids(self, ids, sw_info):
-        self.ids.update(ids)
-        self.switch_info.update(sw_info)
+    def show_error(self, message):
+        self.logger.error(message)
+        self.statusbar.showMessage(message)
 
     @pyqtSlot()
     def refresh_topology(self):
-        self.switches.clear()
-        self.hosts.clear()
-        self.links.clear()
-        self.switches, self.hosts, self.links = self.get_full_topology()
+        if self.rest_worker is not None:
+            self.rest_worker.fetch_topology()
 
-        for switch in self.switches:
-            port_name = switch['ports'][0]['name']
-            switch['name'] = re.findall("([-.\w]+)-eth[\d]+", port_name)[0]
-
-            current_dpid = int(switch['dpid'])
-            if current_dpid == self.ids['dpid']:
-                self.ids['dpid'] += 1
+    @pyqtSlot()
+    def topology_changed(self):
+        if not self.sidebar_frame.isEnabled():
+            self.startup_timer.mark('Mininet started')
+            self.sidebar_frame.setEnabled(True)
+            self.statusbar.clearMessage()
+            # The resync on connect may have come before Mininet was up and found no host names,
+            # so the startup hosts are only known after this refresh
+            self.refresh_scheduler.request()
+            return
+
+        # Pushed ws_topology events already keep the model current, polling is only the fallback
+        if not self.topology_subscriber.connected:
+            self.refresh_scheduler.request()
+
+    @pyqtSlot(str, dict)
+    def apply_topology_event(self, method, payload):
+        topology = self.topology
+        diff = TopologyDiff()
+
+        if method == 'event_switch_enter':
+            switch = Switch.from_dict(payload, switch_name(payload))
+            diff = TopologyDiff.single('switches', added=switch, removed=topology.switch(switch.dpid))
+        elif method == 'event_switch_leave':
+            dpid = payload['dpid']
+            if topology.switch(dpid) is not None:
+                diff.removed['switches'][dpid] = topology.switch(dpid)
+            for host in topology.hosts_of(dpid):
+                diff.removed['hosts'][host.mac] = host
+            for link in topology.links_of(dpid):
+                diff.removed['links'][link.key] = link
+        elif method == 'event_link_add':
+            link = Link.from_dict(payload)
+            diff = TopologyDiff.single('links', added=link, removed=topology.links.get(link.key))
+        elif method == 'event_link_delete':
+            diff = TopologyDiff.single('links', removed=topology.links.get(Link.from_dict(payload).key))
+        elif method == 'event_host_add':
+            name = self.mininet_host_names.get(payload['mac'])
+            if name is None:
+                return
+            host = Host.from_dict(payload, name)
+            diff = TopologyDiff.single('hosts', added=host, removed=topology.host(host.mac))
+        elif method == 'event_host_delete':
+            self.mininet_host_names.pop(payload['mac'], None)
+            diff = TopologyDiff.single('hosts', removed=topology.host(payload['mac']))
+
+        self.apply_diff(diff)
+
+    def apply_diff(self, diff):
+        for switch in diff.added['switches'].values():
+            self.id_allocator.reserve_switch(switch.name, int(switch.dpid, 16))
+
+        self.topology.apply_diff(diff)
+        if not diff.is_empty():
+            self.plotted_diff.merge(diff)
+            self.plot_scheduler.request()
 
-        # Add names of hosts for detailed view
-        host_names = {}
-        for host in self.mininet_thread.net.hosts:
-            host_names[host.MAC()] = host.name
-            
-            try:
-                current_mac = int(str(host.MAC()).rsplit(':', 1)[-1])
-                if current_mac == self.ids['mac']:
-                    self.ids['mac'] += 1
-            except:
-                self.logger.info("Dropped leftover host.")
+    @pyqtSlot()
+    def plot_topology(self):
+        diff = self.plotted_diff
+        self.plotted_diff = TopologyDiff()
 
-        for host in self.hosts:
-            name = host_names.get(host['mac'])
-            host['name'] = name
+        self.canvas_widget.networkPlot(diff)
+        if self.flow_poller is not None and (diff.added['switches'] or diff.removed['switches']):
+            # ofctl_rest addresses switches by their decimal DPID
+            self.flow_poller.set_switches([str(int(dpid, 16)) for dpid in self.topology.switches])
 
-        # Remove leftovers not picked up by RYU
-        to_remove = []
-        for host in self.hosts:
-            if host['name'] is None:
-                to_remove.append(host)
+    @pyqtSlot(object)
+    def update_topology(self, snapshot):
+        # Add names of hosts for detailed view
+        net = self.mininet_thread.net
+        if net is None:
+            return
 
-        for host in to_remove:
-            self.hosts.remove(host)
+        host_names = self.mininet_host_names
+        host_names.clear()
+        for host in net.hosts:
+            host_names[host.MAC()] = host.name
+            self.id_allocator.reserve_host(host.name, host.MAC())
+        for switch in net.switches:
+            self.id_allocator.reserve_switch(switch.name, int(switch.dpid, 16))
 
-        self.canvas_widget.networkPlot(self.switches, self.hosts, self.links)
-        self.logger.info("Topology updated.")
+        switches, hosts, links = records_from_snapshot(snapshot, host_names)
+        diff = diff_snapshots(self.topology.index(), index_snapshot(switches, hosts, links))
+        self.apply_diff(diff)
+        # A full refresh is a single diff already, there is nothing to wait for
+        self.plot_scheduler.flush()
+        self.logger.info(f"Topology updated: {diff}")
 
     @pyqtSlot()
-    def get_full_topology(self):
-        links = requests.get(LINKS_URL)
-        switches = requests.get(SWITCHES_URL)
-        hosts = requests.get(HOSTS_URL)
-
-        try:
-            links_dict = links.json()
-            switches_dict = switches.json()
-            hosts_dict = hosts.json()
-        except JSONDecodeError:
-            self.logger.error('Response could not be serialized')
-
-        return switches_dict, hosts_dict, links_dict
+    def topology_plotted(self):
+        if not self.startup_timer.reported:
+            self.startup_timer.mark('First topology drawn')
+            self.startup_timer.report(self.logger)
 
     def closeEvent(self, event):
         try:
             self.logger.info('Killing Mininet thread')
-            if self.mininet_thread.isRunning():
-                self.mininet_thread.net.stop()
+            self.canvas_widget.shutdown()
+            if self.rest_worker is None:
+                return
+            self.topology_subscriber.stop()
+            self.topology_subscriber.wait()
+            if self.flow_poller is not None:
+                self.flow_poller.stop()
+            if self.mininet_thread.isRunning() and self.mininet_thread.engine is not None:
+                self.mininet_thread.engine.stop()
                 self.mininet_thread.quit()
+            self.rest_worker.shutdown()
+            self.rest_client.close()
 
         except Exception as ex_quit:
             self.logger.exception(ex_quit)
@@ -241,9 +406,21 @@ class MnGui():
 
     def __init__(self, *args, **kwargs):
         super(MnGui, self).__init__(*args, **kwargs)
-        app = QApplication(sys.argv)
-
-        window = MainWindow()
+        startup_timer = StartupTimer()
+        parser = argparse.ArgumentParser(description='Mininet topology GUI.')
+        parser.add_argument('--layout', default='spring', choices=('spring', 'fanned', 'layered', 'radial'),
+            help='how the topology is laid out, the structured layouts scale to thousands of nodes')
+        parser.add_argument('--layout-root', help='switch name or dpid at the center of the radial layout')
+        parser.add_argument('--renderer', default='matplotlib', choices=('matplotlib', 'scene'),
+            help='draw with matplotlib or with a QGraphicsScene, which pans and zooms large topologies smoothly')
+        parser.add_argument('--flow-poll-interval', type=float, default=10, metavar='SECONDS',
+            help='how often the flows of every switch are polled in the background, 0 turns polling off')
+        # Anything else is left for Qt
+        args, qt_args = parser.parse_known_args()
+        app = QApplication(sys.argv[:1] + qt_args)
+        startup_timer.mark('Imports and QApplication')
+
+        window = MainWindow(startup_timer, args.layout, args.layout_root, args.renderer, args.flow_poll_interval)
         window.show()
 
         sys.exit(app.exec())
@@ -0,0 +1,45 @@
+"""
+Coalescing of topology refresh requests.
+"""
+
+from PyQt6.QtCore import QElapsedTimer, QObject, QTimer, pyqtSignal, pyqtSlot
+
+QUIET_PERIOD = 150
+MAX_LATENCY = 1000
+
+
+class RefreshScheduler(QObject):
+    """
+    Turns a burst of refresh requests into a single refresh_signal.
+    The refresh fires once no request arrived for quiet_period ms, but never later than
+    max_latency ms after the first request of the burst.
+    """
+
+    refresh_signal = pyqtSignal()
+
+    def __init__(self, quiet_period=QUIET_PERIOD, max_latency=MAX_LATENCY, parent=None):
+        super().__init__(parent)
+        self.quiet_period = quiet_period
+        self.max_latency = max_latency
+        self.pending = 0
+        self.burst_timer = QElapsedTimer()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    @pyqtSlot()
+    def request(self):
+        if not self.pending:
+            self.burst_timer.start()
+        self.pending += 1
+
+        remaining = self.max_latency - self.burst_timer.elapsed()
+        self.timer.start(max(0, min(self.quiet_period, remaining)))
+
+    @pyqtSlot()
+    def flush(self):
+        if not self.pending:
+            return
+        self.timer.stop()
+        self.pending = 0
+        self.refresh_signal.emit()
@@ -0,0 +1,98 @@
+"""
+Client for the Ryu REST API (rest_topology and ofctl_rest).
+Keeps a single pooled keep-alive session so repeated requests reuse their TCP connections.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from json import JSONDecodeError
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RYU_URL = 'http://0.0.0.0:8080/'
+
+LINKS_URL = RYU_URL + 'v1.0/topology/links'
+SWITCHES_URL = RYU_URL + 'v1.0/topology/switches'
+HOSTS_URL = RYU_URL + 'v1.0/topology/hosts'
+GET_FLOWS_URL = RYU_URL + 'stats/flow/'
+AGGREGATE_FLOWS_URL = RYU_URL + 'stats/aggregateflow/'
+ADD_FLOW_URL = RYU_URL + 'stats/flowentry/add'
+DELETE_FLOW_URL = RYU_URL + 'stats/flowentry/delete'
+
+REQUEST_TIMEOUT = 5
+POOL_SIZE = 8
+
+
+class TopologyClient():
+    """
+    Thin wrapper around a pooled requests session talking to Ryu.
+    The three topology resources are fetched in parallel and returned as one snapshot.
+    """
+
+    logger = logging.getLogger('RestClient')
+
+    def __init__(self, timeout=REQUEST_TIMEOUT, pool_size=POOL_SIZE):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix='topology-fetch')
+
+    def get_json(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def post_json(self, url, body):
+        response = self.session.post(url, json=body, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def get_full_topology(self):
+        """
+        Fetch switches, hosts and links concurrently.
+        Returns a (switches, hosts, links) tuple of the decoded JSON lists.
+        """
+        futures = [self.executor.submit(self.get_json, url) for url in (SWITCHES_URL, HOSTS_URL, LINKS_URL)]
+
+        try:
+            switches, hosts, links = [future.result() for future in futures]
+        except JSONDecodeError:
+            self.logger.error('Response could not be serialized')
+            raise
+
+        # Requests run in parallel, so drop entries referring to switches that were not in the switch list
+        known = {switch['dpid'] for switch in switches}
+        hosts = [host for host in hosts if host['port']['dpid'] in known]
+        links = [link for link in links if link['src']['dpid'] in known and link['dst']['dpid'] in known]
+
+        return switches, hosts, links
+
+    def get_switch_ports(self, dpid):
+        """
+        Names of the ports Ryu knows for a switch, None if the switch is not connected.
+        """
+        switches = self.get_json(f"{SWITCHES_URL}/{dpid}")
+        if not switches:
+            return None
+        return {port['name'] for port in switches[0]['ports']}
+
+    def get_flows(self, dpid):
+        return self.get_json(GET_FLOWS_URL + dpid)[dpid]
+
+    def get_aggregate_flows(self, dpid):
+        # Packet, byte and flow count of the whole table, as a list with a single entry
+        stats = self.get_json(AGGREGATE_FLOWS_URL + dpid)[dpid]
+        return stats[0] if stats else {}
+
+    def add_flow(self, request):
+        return self.post_json(ADD_FLOW_URL, request)
+
+    def delete_flow(self, request):
+        return self.post_json(DELETE_FLOW_URL, request)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
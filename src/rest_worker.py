@@ -0,0 +1,81 @@
+"""
+Background worker running Ryu REST requests off the Qt GUI thread.
+Requests are queued on a thread pool and their results are delivered back through Qt signals.
+"""
+
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+MAX_WORKERS = 4
+
+
+class RestWorker(QObject):
+    """
+    Queues requests for a TopologyClient and returns a Future for each of them.
+    Signals are emitted from the pool threads, so Qt delivers them queued to receivers on the GUI thread.
+    """
+
+    logger = logging.getLogger('RestWorker')
+
+    topology_signal = pyqtSignal(object)
+    flows_signal = pyqtSignal(str, list)
+    flow_modified_signal = pyqtSignal(str)
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, client, max_workers=MAX_WORKERS, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='rest-worker')
+        self.topology_counter = itertools.count(1)
+        self.latest_topology = 0
+
+    def submit(self, description, function, *args, on_result=None):
+        """
+        Queue function(*args) on the pool.
+        on_result is called with the return value on the pool thread, failures are reported through error_signal.
+        """
+        future = self.executor.submit(function, *args)
+
+        def done(finished):
+            if finished.cancelled():
+                return
+            error = finished.exception()
+            if error is not None:
+                self.logger.error(f"{description} failed: {error}")
+                self.error_signal.emit(f"{description} failed: {error}")
+            elif on_result is not None:
+                on_result(finished.result())
+
+        future.add_done_callback(done)
+        return future
+
+    def fetch_topology(self):
+        # Only the most recent snapshot is published, older ones finishing late are dropped
+        request_id = next(self.topology_counter)
+        self.latest_topology = request_id
+
+        def publish(snapshot):
+            if request_id == self.latest_topology:
+                self.topology_signal.emit(snapshot)
+
+        return self.submit('Topology request', self.client.get_full_topology, on_result=publish)
+
+    def fetch_flows(self, dpid):
+        return self.submit(f"Flow request for {dpid}", self.client.get_flows, dpid,
+            on_result=lambda flows: self.flows_signal.emit(dpid, flows))
+
+    def add_flow(self, request):
+        dpid = str(request['dpid'])
+        return self.submit(f"Add flow on {dpid}", self.client.add_flow, request,
+            on_result=lambda _: self.flow_modified_signal.emit(dpid))
+
+    def delete_flow(self, request):
+        dpid = str(request['dpid'])
+        return self.submit(f"Delete flow on {dpid}", self.client.delete_flow, request,
+            on_result=lambda _: self.flow_modified_signal.emit(dpid))
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,46 @@
+"""
+Spatial index for hit-testing nodes under the mouse.
+"""
+
+import numpy as np
+
+# Cell keys pack both cell coordinates into one integer
+KEY_SHIFT = 1 << 32
+
+
+class GridIndex():
+    """
+    Uniform grid over 2D points answering "nearest point within radius" queries.
+    The cells are radius wide, so a query only looks at the points of the 3x3 cells around it
+    instead of testing every point.
+    """
+
+    def __init__(self, points, radius):
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        self.radius = radius
+
+        cells = np.floor(self.points / radius).astype(np.int64)
+        keys = cells[:, 0] * KEY_SHIFT + cells[:, 1]
+        self.order = np.argsort(keys, kind='stable')
+        self.keys, self.starts = np.unique(keys[self.order], return_index=True)
+        self.ends = np.append(self.starts[1:], len(keys))
+
+    def nearest(self, x, y):
+        """
+        Index of the point closest to (x, y) if it is within radius, otherwise -1.
+        """
+        if not len(self.keys):
+            return -1
+
+        cx = int(np.floor(x / self.radius))
+        cy = int(np.floor(y / self.radius))
+        around = np.array([(cx + dx) * KEY_SHIFT + cy + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+        slots = np.minimum(np.searchsorted(self.keys, around), len(self.keys) - 1)
+        slots = slots[self.keys[slots] == around]
+        if not slots.size:
+            return -1
+
+        candidates = np.concatenate([self.order[start:end] for start, end in zip(self.starts[slots], self.ends[slots])])
+        distances = np.sum((self.points[candidates] - (x, y)) ** 2, axis=1)
+        closest = np.argmin(distances)
+        return int(candidates[closest]) if distances[closest] <= self.radius ** 2 else -1
@@ -0,0 +1,31 @@
+"""
+Timing breakdown of the GUI startup.
+Import this module first, the clock starts when it is imported.
+"""
+
+import time
+
+PROCESS_START = time.perf_counter()
+
+
+class StartupTimer():
+    """
+    Records named startup stages and logs how long each one took, once.
+    """
+
+    def __init__(self):
+        self.last = PROCESS_START
+        self.stages = []
+        self.reported = False
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last, now - PROCESS_START))
+        self.last = now
+
+    def report(self, logger):
+        if self.reported:
+            return
+        self.reported = True
+        for stage, duration, total in self.stages:
+            logger.info(f"Startup - {stage}: {duration * 1000:.0f} ms (at {total * 1000:.0f} ms)")
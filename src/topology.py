@@ -0,0 +1,220 @@
+"""
+In-memory model of the network topology as reported by Ryu.
+Nodes and links are stored as compact records and indexed for constant time lookups.
+"""
+
+import re
+
+
+class Record():
+    """
+    Base class for the slotted topology records, compared by the values of their slots.
+    """
+
+    __slots__ = ()
+
+    def values(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.values() == other.values()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.values())
+
+    def __repr__(self):
+        fields = ', '.join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Switch(Record):
+    __slots__ = ('dpid', 'name', 'ports')
+
+    def __init__(self, dpid, name, ports=()):
+        self.dpid = dpid
+        self.name = name
+        self.ports = tuple(ports)
+
+    @classmethod
+    def from_dict(cls, switch, name):
+        """
+        Build a switch from a rest_topology/ws_topology switch dict, ports are stored as (port_no, name) pairs.
+        """
+        return cls(switch['dpid'], name, ((port['port_no'], port['name']) for port in switch['ports']))
+
+
+class Host(Record):
+    __slots__ = ('mac', 'name', 'dpid', 'port_no', 'port_name', 'ipv4')
+
+    def __init__(self, mac, name, dpid, port_no, port_name, ipv4=()):
+        self.mac = mac
+        self.name = name
+        self.dpid = dpid
+        self.port_no = port_no
+        self.port_name = port_name
+        self.ipv4 = tuple(ipv4)
+
+    @classmethod
+    def from_dict(cls, host, name):
+        port = host['port']
+        return cls(host['mac'], name, port['dpid'], port['port_no'], port['name'], host.get('ipv4', ()))
+
+
+class Link(Record):
+    __slots__ = ('src_dpid', 'src_port', 'dst_dpid', 'dst_port')
+
+    def __init__(self, src_dpid, src_port, dst_dpid, dst_port):
+        self.src_dpid = src_dpid
+        self.src_port = src_port
+        self.dst_dpid = dst_dpid
+        self.dst_port = dst_port
+
+    @property
+    def key(self):
+        return (self.src_dpid, self.src_port, self.dst_dpid, self.dst_port)
+
+    @classmethod
+    def from_dict(cls, link):
+        return cls(link['src']['dpid'], link['src']['port_no'], link['dst']['dpid'], link['dst']['port_no'])
+
+
+def switch_name(switch):
+    """
+    Mininet names the ports of a switch <switch name>-eth<n>, which is the only place Ryu reports the name.
+    """
+    if switch['ports']:
+        return re.findall("([-.\\w]+)-eth[\\d]+", switch['ports'][0]['name'])[0]
+    return f"s{int(switch['dpid'], 16)}"
+
+
+def records_from_snapshot(snapshot, host_names):
+    """
+    Convert a (switches, hosts, links) snapshot of Ryu dicts into records.
+    host_names maps MACs to Mininet host names, hosts missing from it are leftovers and are dropped.
+    """
+    switches, hosts, links = snapshot
+    switches = [Switch.from_dict(switch, switch_name(switch)) for switch in switches]
+    hosts = [Host.from_dict(host, host_names[host['mac']]) for host in hosts if host['mac'] in host_names]
+    links = [Link.from_dict(link) for link in links]
+    return switches, hosts, links
+
+
+class TopologyModel():
+    """
+    Single source of truth for switches, hosts and links.
+    Besides the primary dicts (by dpid, MAC and link key) it keeps name indexes and per-switch adjacency,
+    all kept up to date by apply_diff. Only the thread that owns it (the GUI thread or the headless runner) uses it,
+    so it takes no lock.
+    """
+
+    def __init__(self):
+        self.switches = {}
+        self.hosts = {}
+        self.links = {}
+        self.switch_names = {}
+        self.host_names = {}
+        self.switch_hosts = {}
+        self.switch_links = {}
+        self.adjacency = {}
+
+    def index(self):
+        return {'switches': self.switches, 'hosts': self.hosts, 'links': self.links}
+
+    def apply_diff(self, diff):
+        for link in diff.removed['links'].values():
+            self.remove_link(link)
+        for host in diff.removed['hosts'].values():
+            self.remove_host(host)
+        for switch in diff.removed['switches'].values():
+            self.remove_switch(switch)
+
+        for old, new in diff.changed['switches'].values():
+            self.remove_switch(old, detach=False)
+            self.add_switch(new)
+        for old, new in diff.changed['hosts'].values():
+            self.remove_host(old)
+            self.add_host(new)
+        for old, new in diff.changed['links'].values():
+            self.remove_link(old)
+            self.add_link(new)
+
+        for switch in diff.added['switches'].values():
+            self.add_switch(switch)
+        for host in diff.added['hosts'].values():
+            self.add_host(host)
+        for link in diff.added['links'].values():
+            self.add_link(link)
+
+    def add_switch(self, switch):
+        self.switches[switch.dpid] = switch
+        self.switch_names[switch.name] = switch
+        self.switch_hosts.setdefault(switch.dpid, {})
+        self.switch_links.setdefault(switch.dpid, {})
+        self.adjacency.setdefault(switch.dpid, {})
+
+    def remove_switch(self, switch, detach=True):
+        # detach=False keeps the host/link indexes when the record is only being replaced
+        self.switches.pop(switch.dpid, None)
+        if self.switch_names.get(switch.name) == switch:
+            del self.switch_names[switch.name]
+
+        if detach:
+            self.switch_hosts.pop(switch.dpid, None)
+            self.switch_links.pop(switch.dpid, None)
+            self.adjacency.pop(switch.dpid, None)
+
+    def add_host(self, host):
+        self.hosts[host.mac] = host
+        self.host_names[host.name] = host
+        self.switch_hosts.setdefault(host.dpid, {})[host.mac] = host
+
+    def remove_host(self, host):
+        self.hosts.pop(host.mac, None)
+        if self.host_names.get(host.name) == host:
+            del self.host_names[host.name]
+        self.switch_hosts.get(host.dpid, {}).pop(host.mac, None)
+
+    def add_link(self, link):
+        self.links[link.key] = link
+        for dpid in (link.src_dpid, link.dst_dpid):
+            self.switch_links.setdefault(dpid, {})[link.key] = link
+
+        neighbors = self.adjacency.setdefault(link.src_dpid, {})
+        neighbors[link.dst_dpid] = neighbors.get(link.dst_dpid, 0) + 1
+
+    def remove_link(self, link):
+        if self.links.pop(link.key, None) is None:
+            return
+        for dpid in (link.src_dpid, link.dst_dpid):
+            self.switch_links.get(dpid, {}).pop(link.key, None)
+
+        neighbors = self.adjacency.get(link.src_dpid, {})
+        count = neighbors.get(link.dst_dpid, 0) - 1
+        if count > 0:
+            neighbors[link.dst_dpid] = count
+        else:
+            neighbors.pop(link.dst_dpid, None)
+
+    def switch(self, dpid):
+        return self.switches.get(dpid)
+
+    def switch_by_name(self, name):
+        return self.switch_names.get(name)
+
+    def host(self, mac):
+        return self.hosts.get(mac)
+
+    def host_by_name(self, name):
+        return self.host_names.get(name)
+
+    def hosts_of(self, dpid):
+        return list(self.switch_hosts.get(dpid, {}).values())
+
+    def links_of(self, dpid):
+        return list(self.switch_links.get(dpid, {}).values())
+
+    def neighbors(self, dpid):
+        return list(self.adjacency.get(dpid, {}))
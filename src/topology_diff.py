@@ -0,0 +1,125 @@
+"""
+Diffing of topology snapshots made of the records in topology.py.
+Snapshots are indexed by switch dpid, host MAC and link endpoints, so only what changed has to be processed downstream.
+"""
+
+KINDS = ('switches', 'hosts', 'links')
+
+
+def switch_key(switch):
+    return switch.dpid
+
+
+def host_key(host):
+    return host.mac
+
+
+def link_key(link):
+    return link.key
+
+
+KEY_FUNCTIONS = {'switches': switch_key, 'hosts': host_key, 'links': link_key}
+
+
+def index_snapshot(switches, hosts, links):
+    """
+    Turn a (switches, hosts, links) snapshot into {kind: {key: item}} dicts.
+    """
+    index = {}
+    for kind, items in zip(KINDS, (switches, hosts, links)):
+        key = KEY_FUNCTIONS[kind]
+        index[kind] = {key(item): item for item in items}
+    return index
+
+
+class TopologyDiff():
+    """
+    Added, removed and changed items of each kind, all stored as {key: item} dicts.
+    Removed items hold the old value, changed items hold (old, new) pairs.
+    """
+
+    def __init__(self):
+        self.added = {kind: {} for kind in KINDS}
+        self.removed = {kind: {} for kind in KINDS}
+        self.changed = {kind: {} for kind in KINDS}
+
+    def is_empty(self):
+        return not any(self.added[kind] or self.removed[kind] or self.changed[kind] for kind in KINDS)
+
+    def __repr__(self):
+        counts = ', '.join(f"{kind}: +{len(self.added[kind])} -{len(self.removed[kind])} ~{len(self.changed[kind])}"
+            for kind in KINDS)
+        return f"TopologyDiff({counts})"
+
+    @classmethod
+    def single(cls, kind, added=None, removed=None):
+        """
+        Build a diff holding one added and/or removed item, as produced by a single topology event.
+        """
+        diff = cls()
+        key = KEY_FUNCTIONS[kind]
+        if added is not None and removed is not None:
+            diff.changed[kind][key(added)] = (removed, added)
+        elif added is not None:
+            diff.added[kind][key(added)] = added
+        elif removed is not None:
+            diff.removed[kind][key(removed)] = removed
+        return diff
+
+    def merge(self, other):
+        """
+        Fold a later diff into this one, so applying the result equals applying both in order.
+        Costs O(size of other), used to hand a burst of events downstream as one diff.
+        """
+        for kind in KINDS:
+            added = self.added[kind]
+            removed = self.removed[kind]
+            changed = self.changed[kind]
+
+            for key, old in other.removed[kind].items():
+                if key in added:
+                    del added[key]
+                elif key in changed:
+                    removed[key] = changed.pop(key)[0]
+                else:
+                    removed[key] = old
+
+            for key, (old, new) in other.changed[kind].items():
+                if key in added:
+                    added[key] = new
+                elif key in changed:
+                    original = changed.pop(key)[0]
+                    if original != new:
+                        changed[key] = (original, new)
+                else:
+                    changed[key] = (old, new)
+
+            for key, new in other.added[kind].items():
+                original = removed.pop(key, None)
+                if original is None:
+                    added[key] = new
+                elif original != new:
+                    changed[key] = (original, new)
+        return self
+
+
+def diff_snapshots(old, new):
+    """
+    Compare two indexed snapshots (see index_snapshot) in O(size) dict operations.
+    """
+    diff = TopologyDiff()
+    for kind in KINDS:
+        old_items = old.get(kind, {})
+        new_items = new.get(kind, {})
+
+        for key, item in new_items.items():
+            previous = old_items.get(key)
+            if previous is None:
+                diff.added[kind][key] = item
+            elif previous != item:
+                diff.changed[kind][key] = (previous, item)
+
+        for key in old_items.keys() - new_items.keys():
+            diff.removed[kind][key] = old_items[key]
+
+    return diff
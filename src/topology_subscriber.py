@@ -0,0 +1,100 @@
+"""
+Subscriber for the Ryu ws_topology application.
+Ryu pushes topology changes as JSON-RPC requests over a websocket, which are forwarded to the GUI as signals.
+"""
+
+import json
+import logging
+import threading
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+from rest_client import RYU_URL
+
+WS_TOPOLOGY_URL = RYU_URL.replace('http://', 'ws://', 1) + 'v1.0/topology/ws'
+RECONNECT_DELAY = 500
+MAX_RECONNECT_DELAY = 8000
+
+TOPOLOGY_EVENTS = (
+    'event_switch_enter',
+    'event_switch_leave',
+    'event_link_add',
+    'event_link_delete',
+    'event_host_add',
+)
+
+
+class TopologySubscriber(QThread):
+    """
+    The thread which listens for topology events pushed by ws_topology.
+    Every event is emitted with its method name and the switch/link/host dict it carries.
+    """
+
+    logger = logging.getLogger('TopologySubscriber')
+
+    topology_event_signal = pyqtSignal(str, dict)
+    connected_signal = pyqtSignal()
+    disconnected_signal = pyqtSignal()
+
+    def __init__(self, url=WS_TOPOLOGY_URL, parent=None):
+        QThread.__init__(self, parent)
+        self.url = url
+        self.connected = False
+        self.connection = None
+        self.stopped = False
+        # Set by stop(), so a pending reconnect delay ends right away
+        self.wake = threading.Event()
+
+    @staticmethod
+    def available():
+        return websocket is not None
+
+    def run(self):
+        if not self.available():
+            self.logger.warning("websocket-client is not installed, falling back to polling.")
+            return
+
+        delay = RECONNECT_DELAY
+        while not self.stopped:
+            try:
+                self.connection = websocket.create_connection(self.url)
+                self.connected = True
+                delay = RECONNECT_DELAY
+                self.connected_signal.emit()
+                self.logger.info("Subscribed to topology events.")
+                self.listen()
+            except Exception as ex_ws:
+                if not self.stopped:
+                    self.logger.info(f"Topology websocket unavailable: {ex_ws}")
+            finally:
+                if self.connected:
+                    self.connected = False
+                    self.disconnected_signal.emit()
+
+            if not self.stopped:
+                self.wake.wait(delay / 1000)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def listen(self):
+        while not self.stopped:
+            message = json.loads(self.connection.recv())
+
+            # ws_topology waits for a JSON-RPC reply to every event it sends
+            if 'id' in message:
+                self.connection.send(json.dumps({'jsonrpc': '2.0', 'id': message['id'], 'result': ''}))
+
+            method = message.get('method')
+            if method in TOPOLOGY_EVENTS:
+                for payload in message.get('params', []):
+                    self.topology_event_signal.emit(method, payload)
+
+    def stop(self):
+        self.stopped = True
+        self.wake.set()
+        if self.connection is not None:
+            self.connection.close()
@@ -1,126 +1,402 @@
 from PyQt6.QtWidgets import QWidget, QGridLayout
 from PyQt6.QtGui import QFont
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import networkx as nx
-from mpl_interactions import panhandler
+from PyQt6.QtCore import QTimer, pyqtSignal, pyqtSlot
 from markers import MarkerGenerator
+from layout_worker import LayoutWorker
+
+# Hover is handled at most once per interval (ms), a node is hit within the radius (points) of its center
+HOVER_INTERVAL = 30
+HOVER_RADIUS = 14
+# The hosts of a switch collapse into a badge once they are drawn closer than this (points) to each other
+DETAIL_DISTANCE = 20
+BADGE_OFFSET = (14, -14)
+BADGE_COLOR = '#e6550d'
+# Only what lies within the view plus this fraction of its size on every side is drawn
+CULL_MARGIN = 0.5
+
+
+def node_description(node, data):
+    # Information about a node based on its type
+    text = data['element'] + ' ' + data['name']
+    if data['element'] == 'Switch':
+        return text + '\nDPID: ' + str(node).lstrip('0')
+    return text + '\nMAC: ' + node + '\nPort: ' + data['port']
 
 
 class CanvasWidget(QWidget):
 
     """
     The widget which makes up the plotting (display) part of the app.
-    Relies on NetworkX for graph creation and plotting (which is build upon matplotlib).
+    Relies on NetworkX for the graph and matplotlib for plotting.
+    Both are only imported when the first topology is plotted, so the window can be shown before.
+    The layout is computed by a LayoutWorker, the plot is drawn once its positions come back.
+    The artists are created once and updated in place, the hover annotation is blitted over a cached background.
+    Hovered nodes are looked up in a grid index of their screen positions, rebuilt after every full draw.
+    Zoomed out far enough that its hosts would overlap, the hosts of a switch are replaced by a badge with their count.
+    Zoomed in, only nodes and edges around the view are handed to the collections.
     """
 
+    plotted_signal = pyqtSignal()
+
     def __init__(self, parent=None):
         super(CanvasWidget, self).__init__()   
         self.ax = ''
         self.pan_handler = ''
+        self.figure = None
+        self.canvas = None
+        self.graph = None
+        self.drawn_graph = None
+        self.positions = {}
+        self.switch_nodes = []
+        self.host_nodes = []
+        self.switch_offsets = None
+        self.host_offsets = None
+        self.switch_index = {}
+        self.switch_edges = None
+        self.host_switch = None
+        self.host_counts = None
+        self.host_spacing = None
+        self.collapsed = None
+        self.culled_region = None
+        # The view is fitted to the topology on the first plot only, later changes keep the user's pan and zoom
+        self.view_fitted = False
+        self.badges = {}
+        self.nodes = []
+        self.node_offsets = None
+        self.node_index = None
+        self.background = None
+        self.annotated = None
+        self.hover_cid = None
+        self.hover_position = None
+        # Filled by the flow poller, read for the flow count of hovered switches
+        self.flow_cache = None
+        self.hover_timer = QTimer(self)
+        self.hover_timer.setSingleShot(True)
+        self.hover_timer.timeout.connect(self.update_hover)
+        self.layout_worker = LayoutWorker(self)
+        self.layout_worker.positions_signal.connect(self.draw_network)
         font = QFont()
         font.setPointSize(16)
-        mg = MarkerGenerator()
-        self.host_marker = mg.host_marker
-        self.switch_marker = mg.switch_marker
+        # Markers are loaded on the first plot
+        self.markers = MarkerGenerator()
         self.initUI()
 
     def initUI(self):
-        grid = QGridLayout()
-        self.setLayout(grid)
-
-        self.figure, self.ax = plt.subplots()
-        self.canvas = FigureCanvas(self.figure)
-        grid.addWidget(self.canvas, 0, 1, 9, 9)
+        self.grid = QGridLayout()
+        self.setLayout(self.grid)
 
         self.show()
 
-    def networkPlot(self, switches, hosts, links):
-        self.figure.clf()
+    def init_canvas(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from mpl_interactions import panhandler
+        from ui.edge_collection import EdgeCollection
+
+        self.figure = Figure()
         self.ax = self.figure.add_subplot(111)
         self.ax.axis("off")
+        self.ax.margins(0.1)
+        self.canvas = FigureCanvas(self.figure)
+        self.grid.addWidget(self.canvas, 0, 1, 9, 9)
+
+        self.drawn_edges = EdgeCollection(colors='k', linewidths=1.0, zorder=1)
+        self.ax.add_collection(self.drawn_edges)
+        # Switches and hosts are separate collections to be able to annotate them by type
+        self.drawn_switches = self.ax.scatter([], [], s=800, c='#1f78b4', marker=self.markers.switch_marker,
+            linewidths=0.2, zorder=2)
+        self.drawn_hosts = self.ax.scatter([], [], s=800, c='#1f78b4', marker=self.markers.host_marker,
+            linewidths=0.2, zorder=2)
 
-        G = nx.Graph()
-
-        for switch in switches:
-            G.add_node(switch['dpid'], element='Switch', name=switch['name'])
-
-        for host in hosts:
-            G.add_node(host['mac'], element='Host', name=host['name'], port=host['port']['name'])
-            G.add_edge(host['mac'], host['port']['dpid'])
-
-        for link in links:
-            source = link['src']['dpid']
-            destination = link['dst']['dpid']
-            if int(source) < int(destination):
-                G.add_edge(source, destination)
-
-        pos = nx.spring_layout(G)
-
-        switch_list = [x for x,y in G.nodes(data=True) if y['element'] == 'Switch']
-        host_list = [x for x,y in G.nodes(data=True) if y['element'] == 'Host']
-
-        nx.draw_networkx_edges(
-            G,
-            pos=pos,
-            ax=self.ax,
-            arrows=True,
-            arrowstyle="-",
-            min_source_margin=15,
-            min_target_margin=15,
-        )
-
-        # Draw nodes in two batches to be able to annotate them later
-        drawn_switches = nx.draw_networkx_nodes(G, pos=pos, ax=self.ax, node_size=800, linewidths=0.2, nodelist=switch_list, node_shape=self.switch_marker)
-        drawn_hosts = nx.draw_networkx_nodes(G, pos=pos, ax=self.ax, node_size=800, linewidths=0.2, nodelist=host_list, node_shape=self.host_marker)
-        
-        # Calculate node IDs needed for the hover function
-        idx_switches = {}
-        idc_hosts = {}
-        for idx, node in enumerate(switch_list):
-            idx_switches[idx] = node
-        for idx, node in enumerate(host_list):
-            idc_hosts[idx] = node
-
-        # Annotate nodes with information about them based on type
-        annot = self.ax.annotate("", xy=(0,0), xytext=(20,20),textcoords="offset points",
+        # Animated artists are left out of normal draws, the annotation is blitted on top of the saved background
+        self.annot = self.ax.annotate("", xy=(0,0), xytext=(20,20),textcoords="offset points",
                             bbox=dict(boxstyle="round", fc="w"),
-                            arrowprops=dict(arrowstyle="->"))
-        annot.set_visible(False)
-
-        def update_annot(ind, idx_list):
-            node_idx = ind['ind'][0]
-            node = idx_list[node_idx]
-            xy = pos[node]
-            annot.xy = xy
-
-            current = G.nodes[node]
-            text = current['element'] + ' ' + current['name']
-            if current['element'] == 'Switch':
-                text = text + '\nDPID: ' + str(node).lstrip('0')
-            else:
-                text = text + '\nMAC: ' + node + '\nPort: ' + current['port']
-            annot.set_text(text)
-
-        def hover(event):
-            vis = annot.get_visible()
-            if event.inaxes == self.ax:
-                cont, ind = drawn_switches.contains(event)
-                if cont:
-                    update(ind, idx_switches)
-                else:
-                    cont, ind = drawn_hosts.contains(event)
-                    if cont:
-                        update(ind, idc_hosts)
-                    if vis:
-                        annot.set_visible(False)
-                        self.canvas.draw_idle()
-
-        def update(ind, idx_list):
-            update_annot(ind, idx_list)
-            annot.set_visible(True)
-            self.canvas.draw_idle()
-        
+                            arrowprops=dict(arrowstyle="->"), animated=True)
+        self.annot.set_visible(False)
+
         self.pan_handler = panhandler(self.figure)
-        self.canvas.mpl_connect("motion_notify_event", hover)
-        self.canvas.draw_idle()
\ No newline at end of file
+        self.ax.callbacks.connect("xlim_changed", self.update_view)
+        self.ax.callbacks.connect("ylim_changed", self.update_view)
+        self.canvas.mpl_connect("resize_event", self.update_view)
+        self.canvas.mpl_connect("draw_event", self.save_background)
+        self.hover_cid = self.canvas.mpl_connect("motion_notify_event", self.hover)
+
+    def set_layout(self, name, **options):
+        self.layout_worker.set_layout(name, **options)
+
+    def shutdown(self):
+        self.layout_worker.shutdown()
+        self.hover_timer.stop()
+        if self.hover_cid is not None:
+            self.canvas.mpl_disconnect(self.hover_cid)
+            self.hover_cid = None
+
+    def update_graph(self, diff):
+        """
+        Apply a TopologyDiff to the persistent graph instead of rebuilding it.
+        Changed items are handled as a removal of the old value followed by an addition of the new one.
+        """
+        if self.graph is None:
+            import networkx as nx
+            self.graph = nx.Graph()
+        G = self.graph
+
+        for link in diff.removed['links'].values():
+            self.remove_link(link)
+        for host in diff.removed['hosts'].values():
+            if G.has_node(host.mac):
+                G.remove_node(host.mac)
+        for switch in diff.removed['switches'].values():
+            if G.has_node(switch.dpid):
+                G.remove_node(switch.dpid)
+
+        for old, new in diff.changed['switches'].values():
+            G.add_node(new.dpid, element='Switch', name=new.name)
+        for old, new in diff.changed['hosts'].values():
+            if G.has_edge(old.mac, old.dpid):
+                G.remove_edge(old.mac, old.dpid)
+            self.add_host(new)
+        for old, new in diff.changed['links'].values():
+            self.remove_link(old)
+            self.add_link(new)
+
+        for switch in diff.added['switches'].values():
+            G.add_node(switch.dpid, element='Switch', name=switch.name)
+        for host in diff.added['hosts'].values():
+            self.add_host(host)
+        for link in diff.added['links'].values():
+            self.add_link(link)
+
+    def add_host(self, host):
+        self.graph.add_node(host.mac, element='Host', name=host.name, port=host.port_name)
+        if self.graph.has_node(host.dpid):
+            self.graph.add_edge(host.mac, host.dpid)
+
+    def add_link(self, link):
+        source = link.src_dpid
+        destination = link.dst_dpid
+        # Links are reported in both directions, dpids are fixed width hex so string order is enough
+        if source < destination and self.graph.has_node(source) and self.graph.has_node(destination):
+            self.graph.add_edge(source, destination)
+
+    def remove_link(self, link):
+        source = link.src_dpid
+        destination = link.dst_dpid
+        if source < destination and self.graph.has_edge(source, destination):
+            self.graph.remove_edge(source, destination)
+
+    def networkPlot(self, diff):
+        if diff.is_empty():
+            return
+
+        self.update_graph(diff)
+        # The worker gets its own copy, the graph keeps changing while the layout runs
+        self.layout_worker.request(self.graph.copy())
+
+    @pyqtSlot(int, object, object)
+    def draw_network(self, request_id, G, pos):
+        if request_id != self.layout_worker.latest:
+            return
+
+        import numpy as np
+
+        if self.canvas is None:
+            self.init_canvas()
+
+        self.drawn_graph = G
+        self.positions = pos
+        self.switch_nodes = [x for x,y in G.nodes(data=True) if y['element'] == 'Switch']
+        self.host_nodes = [x for x,y in G.nodes(data=True) if y['element'] == 'Host']
+
+        self.switch_offsets = np.array([pos[node] for node in self.switch_nodes], dtype=float).reshape(-1, 2)
+        self.host_offsets = np.array([pos[node] for node in self.host_nodes], dtype=float).reshape(-1, 2)
+        self.switch_edges = np.array([(pos[u], pos[v]) for u, v in G.edges
+            if G.nodes[u]['element'] == G.nodes[v]['element'] == 'Switch'], dtype=float).reshape(-1, 2, 2)
+        self.drawn_switches.set_offsets(self.switch_offsets)
+
+        self.switch_index = {node: i for i, node in enumerate(self.switch_nodes)}
+        self.host_switch = np.array([next((self.switch_index[neighbor] for neighbor in G.neighbors(host)
+            if neighbor in self.switch_index), -1) for host in self.host_nodes], dtype=int)
+
+        # Hosts are assumed to be spread around their switch at their mean distance from it,
+        # the gap between two of them decides when the switch collapses
+        attached = self.host_switch >= 0
+        switches = self.host_switch[attached]
+        distances = np.hypot(*(self.host_offsets[attached] - self.switch_offsets[switches]).T)
+        self.host_counts = np.bincount(switches, minlength=len(self.switch_nodes))
+        counts = np.maximum(self.host_counts, 1)
+        radius = np.bincount(switches, weights=distances, minlength=len(self.switch_nodes)) / counts
+        self.host_spacing = np.where(self.host_counts > 0, np.minimum(radius, 2 * np.pi * radius / counts), np.inf)
+
+        self.annotated = None
+        self.annot.set_visible(False)
+        self.remove_badges()
+        self.collapsed = None
+        self.culled_region = None
+
+        if not self.view_fitted:
+            self.view_fitted = True
+            self.fit_limits()
+        self.update_view()
+
+        self.canvas.draw_idle()
+        self.plotted_signal.emit()
+
+    def fit_limits(self):
+        import numpy as np
+
+        # Collections are not covered by relim, fit the view to the offsets directly
+        self.ax.ignore_existing_data_limits = True
+        if len(self.switch_nodes) + len(self.host_nodes):
+            self.ax.update_datalim(np.concatenate((self.switch_offsets, self.host_offsets)))
+        self.ax.set_autoscale_on(True)
+        self.ax.autoscale_view()
+
+    @pyqtSlot()
+    def fit_view(self):
+        """
+        Show the whole topology again, bound to the Refresh button.
+        """
+        if self.drawn_graph is None:
+            return
+        self.fit_limits()
+        self.update_view()
+        self.canvas.draw_idle()
+
+    def update_view(self, *args):
+        """
+        Hand the collections only what is around the view, and replace the hosts of every switch by a count badge
+        while they would be drawn on top of each other.
+        Connected to limit changes and resizes. The culled region is larger than the view, so it is only
+        recomputed once the view leaves it, zooms in well past it or some switch crosses the detail threshold.
+        """
+        if self.drawn_graph is None:
+            return
+
+        import numpy as np
+
+        origin, unit = self.ax.transData.transform([(0, 0), (1, 1)])
+        scale = min(abs(unit - origin))
+        collapsed = self.host_spacing * scale < DETAIL_DISTANCE * self.figure.dpi / 72
+
+        (x0, y0), (x1, y1) = np.sort(self.ax.viewLim.get_points(), axis=0)
+        if (self.collapsed is not None and np.array_equal(collapsed, self.collapsed)
+                and self.region_covers(x0, y0, x1, y1)):
+            return
+        self.collapsed = collapsed
+
+        width = x1 - x0
+        height = y1 - y0
+        region = (x0 - CULL_MARGIN * width, y0 - CULL_MARGIN * height,
+            x1 + CULL_MARGIN * width, y1 + CULL_MARGIN * height)
+        self.culled_region = region
+
+        def inside(points):
+            return ((points[:, 0] >= region[0]) & (points[:, 1] >= region[1])
+                & (points[:, 0] <= region[2]) & (points[:, 1] <= region[3]))
+
+        def crossing(edges):
+            # Edges whose bounding box overlaps the region, so long edges through the view stay
+            low = edges.min(axis=1)
+            high = edges.max(axis=1)
+            return ((high[:, 0] >= region[0]) & (high[:, 1] >= region[1])
+                & (low[:, 0] <= region[2]) & (low[:, 1] <= region[3]))
+
+        # Hosts without a switch are always drawn when in view
+        attached = self.host_switch >= 0
+        expanded = ~attached
+        expanded[attached] = ~collapsed[self.host_switch[attached]]
+        switches = inside(self.switch_offsets)
+        hosts = expanded & inside(self.host_offsets)
+
+        linked = np.flatnonzero(expanded & attached)
+        host_edges = np.stack((self.host_offsets[linked], self.switch_offsets[self.host_switch[linked]]), axis=1)
+        edges = np.concatenate((self.switch_edges, host_edges))
+
+        self.drawn_switches.set_offsets(self.switch_offsets[switches])
+        self.drawn_hosts.set_offsets(self.host_offsets[hosts])
+        self.drawn_edges.set_edges(edges[crossing(edges)])
+        self.nodes = ([self.switch_nodes[i] for i in np.flatnonzero(switches)]
+            + [self.host_nodes[i] for i in np.flatnonzero(hosts)])
+        self.node_offsets = np.concatenate((self.switch_offsets[switches], self.host_offsets[hosts]))
+        self.node_index = None
+
+        badged = set(np.flatnonzero(collapsed & switches).tolist())
+        for i in self.badges.keys() - badged:
+            self.badges.pop(i).remove()
+        for i in badged - self.badges.keys():
+            self.badges[i] = self.ax.annotate(str(self.host_counts[i]), xy=self.switch_offsets[i], xytext=BADGE_OFFSET,
+                textcoords="offset points", ha='center', va='center', fontsize=8, color='w', zorder=3,
+                bbox=dict(boxstyle="circle", fc=BADGE_COLOR, ec='none'))
+        self.canvas.draw_idle()
+
+    def region_covers(self, x0, y0, x1, y1):
+        if self.culled_region is None:
+            return False
+        left, bottom, right, top = self.culled_region
+        inside = left <= x0 and bottom <= y0 and x1 <= right and y1 <= top
+        # After zooming in far, a smaller region saves more than it costs
+        zoomed_in = (x1 - x0) * (1 + 2 * CULL_MARGIN) * 2 < right - left
+        return inside and not zoomed_in
+
+    def remove_badges(self):
+        for badge in self.badges.values():
+            badge.remove()
+        self.badges = {}
+
+    def save_background(self, event):
+        # Any full draw may have moved the nodes on screen (new layout, pan, zoom, resize)
+        self.node_index = None
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        if self.annot.get_visible():
+            self.ax.draw_artist(self.annot)
+
+    def hover(self, event):
+        # Only remember the position, the lookup runs once the interval is over
+        self.hover_position = (event.x, event.y) if event.inaxes == self.ax else None
+        if not self.hover_timer.isActive():
+            self.hover_timer.start(HOVER_INTERVAL)
+
+    @pyqtSlot()
+    def update_hover(self):
+        node = self.node_at(*self.hover_position) if self.hover_position and self.nodes else None
+        if node is not None:
+            self.show_annotation(node)
+        elif self.annot.get_visible():
+            self.annotated = None
+            self.annot.set_visible(False)
+            self.blit_annotation()
+
+    def node_at(self, x, y):
+        if self.node_index is None:
+            from spatial_index import GridIndex
+            screen = self.ax.transData.transform(self.node_offsets)
+            self.node_index = GridIndex(screen, HOVER_RADIUS * self.figure.dpi / 72)
+        index = self.node_index.nearest(x, y)
+        return self.nodes[index] if index >= 0 else None
+
+    def show_annotation(self, node):
+        if node == self.annotated:
+            return
+        self.annotated = node
+        self.annot.xy = self.positions[node]
+
+        text = node_description(node, self.drawn_graph.nodes[node])
+        if node in self.switch_index and self.collapsed[self.switch_index[node]]:
+            text = text + '\nHosts: ' + str(self.host_counts[self.switch_index[node]])
+        if node in self.switch_index and self.flow_cache is not None:
+            aggregate = self.flow_cache.aggregate(str(int(node, 16)))
+            if aggregate:
+                text = text + '\nFlows: ' + str(aggregate.get('flow_count', 0))
+        self.annot.set_text(text)
+        self.annot.set_visible(True)
+        self.blit_annotation()
+
+    def blit_annotation(self):
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        if self.annot.get_visible():
+            self.ax.draw_artist(self.annot)
+        self.canvas.blit(self.figure.bbox)
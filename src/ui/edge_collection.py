@@ -0,0 +1,43 @@
+"""
+Edges of the topology plot as a single collection.
+"""
+
+import numpy as np
+from matplotlib.collections import LineCollection
+
+EDGE_MARGIN = 15
+
+
+class EdgeCollection(LineCollection):
+    """
+    LineCollection that stops every edge margin points short of both of its nodes, so edges end at the node
+    markers instead of running through them. The margin is in screen space, so the segments are trimmed
+    in display coordinates on every draw, for all edges at once.
+    """
+
+    def __init__(self, margin=EDGE_MARGIN, **kwargs):
+        super().__init__([], **kwargs)
+        self.margin = margin
+        self.edges = np.zeros((0, 2, 2))
+
+    def set_edges(self, edges):
+        """
+        Set the untrimmed edges, an (n, 2, 2) array of node positions in data coordinates.
+        """
+        self.edges = np.asarray(edges, dtype=float).reshape(-1, 2, 2)
+        self.stale = True
+
+    def draw(self, renderer):
+        transform = self.axes.transData
+        points = transform.transform(self.edges.reshape(-1, 2)).reshape(-1, 2, 2)
+        vectors = points[:, 1] - points[:, 0]
+        lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+
+        # Nodes closer than both margins together would leave nothing of the edge
+        margin = renderer.points_to_pixels(self.margin)
+        visible = lengths > 2 * margin
+        shift = vectors[visible] * (margin / lengths[visible])[:, None]
+        trimmed = np.stack((points[visible, 0] + shift, points[visible, 1] - shift), axis=1)
+
+        self.set_segments(transform.inverted().transform(trimmed.reshape(-1, 2)).reshape(-1, 2, 2))
+        super().draw(renderer)
@@ -0,0 +1,183 @@
+import math
+from PyQt6.QtWidgets import QGraphicsItem, QGraphicsLineItem, QGraphicsPathItem, QGraphicsScene, QGraphicsView
+from PyQt6.QtGui import QBrush, QColor, QPainter, QPainterPath, QPen
+from PyQt6.QtCore import QLineF, QPointF, QRectF, Qt, pyqtSlot
+from ui.canvas_widget import CanvasWidget, node_description
+
+# Node markers keep their size on screen (px), layout coordinates are scaled up into the scene
+NODE_SIZE = 36
+NODE_COLOR = '#1f78b4'
+SCENE_SCALE = 200
+ZOOM_STEP = 1.2
+
+
+def painter_path(path, size):
+    """
+    Convert a matplotlib marker Path into a QPainterPath fitting a size x size square.
+    Qt's y axis points down, so the marker is flipped back.
+    """
+    from matplotlib.path import Path
+
+    vertices = path.vertices * (size / 2 / abs(path.vertices).max())
+    points = [QPointF(x, -y) for x, y in vertices]
+    codes = path.codes if path.codes is not None else [Path.MOVETO] + [Path.LINETO] * (len(points) - 1)
+
+    result = QPainterPath()
+    i = 0
+    while i < len(points):
+        code = codes[i]
+        if code == Path.MOVETO:
+            result.moveTo(points[i])
+            i += 1
+        elif code == Path.LINETO:
+            result.lineTo(points[i])
+            i += 1
+        elif code == Path.CURVE3:
+            result.quadTo(points[i], points[i + 1])
+            i += 2
+        elif code == Path.CURVE4:
+            result.cubicTo(points[i], points[i + 1], points[i + 2])
+            i += 3
+        else:
+            if code == Path.CLOSEPOLY:
+                result.closeSubpath()
+            i += 1
+    return result
+
+
+class NodeItem(QGraphicsPathItem):
+
+    """
+    Marker of a switch or host on a white disc that hides the edges below it.
+    Ignores the view transformation so it keeps its size while zooming, and is cached as a device pixmap.
+    """
+
+    def __init__(self, path, element):
+        super().__init__(path)
+        self.element = element
+        self.radius = NODE_SIZE / 2
+        self.setBrush(QBrush(QColor(NODE_COLOR)))
+        self.setPen(QPen(QColor(NODE_COLOR), 0.2))
+        self.setZValue(1)
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIgnoresTransformations)
+        self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+
+    def boundingRect(self):
+        return QRectF(-self.radius, -self.radius, 2 * self.radius, 2 * self.radius)
+
+    def shape(self):
+        shape = QPainterPath()
+        shape.addEllipse(self.boundingRect())
+        return shape
+
+    def paint(self, painter, option, widget=None):
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QBrush(QColor('white')))
+        painter.drawEllipse(self.boundingRect())
+        super().paint(painter, option, widget)
+
+
+class TopologyView(QGraphicsView):
+
+    """
+    View with drag to pan and wheel to zoom around the cursor.
+    """
+
+    def __init__(self, scene, parent=None):
+        super(TopologyView, self).__init__(scene, parent)
+        self.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.SmartViewportUpdate)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+
+    def wheelEvent(self, event):
+        factor = ZOOM_STEP ** (event.angleDelta().y() / 120)
+        self.scale(factor, factor)
+
+
+class SceneWidget(CanvasWidget):
+
+    """
+    Alternative to the matplotlib canvas, drawing the topology with a QGraphicsScene.
+    Graph handling and the layout worker are shared with CanvasWidget. Every node and edge is an item
+    that is kept across refreshes and only moved, the scene's BSP index takes care of culling and of
+    finding the item under the cursor for its tooltip.
+    """
+
+    def init_canvas(self):
+        self.scene = QGraphicsScene(self)
+        self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.BspTreeIndex)
+        self.canvas = TopologyView(self.scene, self)
+        self.grid.addWidget(self.canvas, 0, 1, 9, 9)
+
+        self.marker_paths = {'Switch': painter_path(self.markers.switch_marker, NODE_SIZE),
+            'Host': painter_path(self.markers.host_marker, NODE_SIZE)}
+        self.edge_pen = QPen(QColor('black'), 0)
+        self.node_items = {}
+        self.edge_items = {}
+        self.graph_bounds = None
+        # Fitted to the topology on the first plot only, later changes keep the user's pan and zoom
+        self.view_fitted = False
+
+    @pyqtSlot(int, object, object)
+    def draw_network(self, request_id, G, pos):
+        if request_id != self.layout_worker.latest:
+            return
+
+        if self.canvas is None:
+            self.init_canvas()
+
+        self.drawn_graph = G
+        self.positions = pos
+        # Spread larger graphs further, the markers do not shrink with them
+        scale = SCENE_SCALE * max(1, math.sqrt(len(G)))
+        points = {node: QPointF(x * scale, -y * scale) for node, (x, y) in pos.items()}
+
+        for node in self.node_items.keys() - set(G.nodes):
+            self.scene.removeItem(self.node_items.pop(node))
+        for node, data in G.nodes(data=True):
+            item = self.node_items.get(node)
+            if item is None or item.element != data['element']:
+                if item is not None:
+                    self.scene.removeItem(item)
+                item = NodeItem(self.marker_paths[data['element']], data['element'])
+                self.scene.addItem(item)
+                self.node_items[node] = item
+            item.setToolTip(node_description(node, data))
+            if item.pos() != points[node]:
+                item.setPos(points[node])
+
+        # Nodes are dpid and MAC strings, order the ends so an edge keeps its key between graph copies
+        edges = {(u, v) if u < v else (v, u) for u, v in G.edges}
+        for edge in self.edge_items.keys() - edges:
+            self.scene.removeItem(self.edge_items.pop(edge))
+        for u, v in edges:
+            line = QLineF(points[u], points[v])
+            item = self.edge_items.get((u, v))
+            if item is None:
+                item = QGraphicsLineItem(line)
+                item.setPen(self.edge_pen)
+                self.scene.addItem(item)
+                self.edge_items[(u, v)] = item
+            elif item.line() != line:
+                item.setLine(line)
+
+        if points:
+            xs = [point.x() for point in points.values()]
+            ys = [point.y() for point in points.values()]
+            bounds = QRectF(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)).adjusted(
+                -NODE_SIZE, -NODE_SIZE, NODE_SIZE, NODE_SIZE)
+            # Leave room around the graph to pan into
+            self.canvas.setSceneRect(bounds.adjusted(-bounds.width(), -bounds.height(), bounds.width(), bounds.height()))
+            self.graph_bounds = bounds
+            if not self.view_fitted:
+                self.view_fitted = True
+                self.fit_view()
+        self.plotted_signal.emit()
+
+    @pyqtSlot()
+    def fit_view(self):
+        if self.graph_bounds is not None:
+            self.canvas.fitInView(self.graph_bounds, Qt.AspectRatioMode.KeepAspectRatio)
@@ -12,7 +12,7 @@ from PyQt6 import QtCore, QtGui, QtWidgets
 class Ui_Dialog(object):
     def setupUi(self, Dialog):
         Dialog.setObjectName("Dialog")
-        Dialog.resize(374, 329)
+        Dialog.resize(640, 420)
         self.gridLayout = QtWidgets.QGridLayout(Dialog)
         self.gridLayout.setObjectName("gridLayout")
         self.full_layout = QtWidgets.QVBoxLayout()
@@ -27,12 +27,25 @@ class Ui_Dialog(object):
         self.switch_box = QtWidgets.QComboBox(Dialog)
         self.switch_box.setObjectName("switch_box")
         self.form_layout.setWidget(0, QtWidgets.QFormLayout.ItemRole.FieldRole, self.switch_box)
+        self.filter_label = QtWidgets.QLabel(Dialog)
+        self.filter_label.setObjectName("filter_label")
+        self.form_layout.setWidget(1, QtWidgets.QFormLayout.ItemRole.LabelRole, self.filter_label)
+        self.filter_box = QtWidgets.QLineEdit(Dialog)
+        self.filter_box.setClearButtonEnabled(True)
+        self.filter_box.setObjectName("filter_box")
+        self.form_layout.setWidget(1, QtWidgets.QFormLayout.ItemRole.FieldRole, self.filter_box)
         self.switch_name_label_2 = QtWidgets.QLabel(Dialog)
         self.switch_name_label_2.setObjectName("switch_name_label_2")
-        self.form_layout.setWidget(1, QtWidgets.QFormLayout.ItemRole.LabelRole, self.switch_name_label_2)
-        self.flow_list = QtWidgets.QListWidget(Dialog)
-        self.flow_list.setObjectName("flow_list")
-        self.form_layout.setWidget(1, QtWidgets.QFormLayout.ItemRole.FieldRole, self.flow_list)
+        self.form_layout.setWidget(2, QtWidgets.QFormLayout.ItemRole.LabelRole, self.switch_name_label_2)
+        self.flow_table = QtWidgets.QTableView(Dialog)
+        self.flow_table.setAlternatingRowColors(True)
+        self.flow_table.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.SingleSelection)
+        self.flow_table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.flow_table.setSortingEnabled(True)
+        self.flow_table.setObjectName("flow_table")
+        self.flow_table.horizontalHeader().setStretchLastSection(True)
+        self.flow_table.verticalHeader().setVisible(False)
+        self.form_layout.setWidget(2, QtWidgets.QFormLayout.ItemRole.FieldRole, self.flow_table)
         self.full_layout.addLayout(self.form_layout)
         self.full_layout.setStretch(0, 3)
         self.gridLayout.addLayout(self.full_layout, 0, 0, 1, 1)
@@ -59,5 +72,7 @@ class Ui_Dialog(object):
         _translate = QtCore.QCoreApplication.translate
         Dialog.setWindowTitle(_translate("Dialog", "View Flows"))
         self.switch_label.setText(_translate("Dialog", "Switch"))
+        self.filter_label.setText(_translate("Dialog", "Filter"))
+        self.filter_box.setPlaceholderText(_translate("Dialog", "Match or action"))
         self.switch_name_label_2.setText(_translate("Dialog", "Flow List"))
         self.add_flow_button.setText(_translate("Dialog", "Add Flow"))